@@ -1,84 +1,277 @@
 import os
 import json
 import argparse
-from itertools import combinations
+from itertools import combinations, islice
+from framework import Framework, load_framework
+import instrument
+import disk_cache
+from grounded import grounded_extension
+from kernel import framework_kernel
+from labelling import IN, CredulousLabelling
+from scc import cone_framework
+from semantics import (
+    SEMANTICS,
+    credulous_acceptance,
+    extensions,
+    is_credulously_accepted,
+    is_skeptically_accepted,
+)
 
 
 class ArgumentationFramework:
-    def __init__(self, data_file, argument):
-        data = self.load_data(data_file)
+    def __init__(
+        self, data_file, argument, engine="labelling", semantics="admissible", skeptical=False
+    ):
+        # A data file, or an already built framework (e.g. DynamicFramework.framework())
+        self.af = data_file if isinstance(data_file, Framework) else load_framework(data_file)
         self.argument = argument
-        self.arguments = set(data["Arguments"].keys())
-        self.attacks = {tuple(pair) for pair in data["Attack Relations"]}
+        self.engine = engine
+        self.semantics = semantics
+        self.skeptical = skeptical
+        self.arguments = set(self.af.names)
+        # Arguments that may join the target in a witness, narrowed by fast_check
+        self.candidates = set(self.arguments)
     
     def compute(self):
         # First ensure that the target is in the set
         if self.argument not in self.arguments:
             print('The provided argument does not appear in the AF.')
-            return exit(0)
-        fast_check = self.fast_check()
-        if not fast_check:
-            print(f"'{self.argument}' has no attackers, this argument is credulously acceptable under Admissible Semantics.")
-        if fast_check:
-            self.is_credulously_accepted()
+            return None
+        # With the cache on, the result of an earlier run (witness included) is
+        # printed again as it was
+        query = ("result", self.engine, self.semantics, self.mode(), self.argument)
+        result = disk_cache.cached(self.af, query, self.solve)
+        self.print_result(result)
+        return result["accepted"]
+
+    # {"accepted": bool} plus, for credulous admissible queries, either the "reason"
+    # the answer is immediate or the "witness" found (null if none)
+    def solve(self):
+        if self.semantics != "admissible" or self.skeptical:
+            return {"accepted": self.is_accepted()}
+        if self.af.attacks_itself(self.argument):  # Check loop to itself
+            return {"accepted": False, "reason": "self-attacking"}
+        if not self.fast_check():
+            return {"accepted": True, "reason": "unattacked"}
+        witness = self.credulous_witness()
+        return {"accepted": witness is not None, "witness": witness}
 
-    # Load the data from the file
-    def load_data(self, data_file):
-        with open(data_file, "r") as f:
-            data = json.load(f)
-        return data
+    def print_result(self, result):
+        reason = result.get("reason")
+        if reason == "self-attacking":
+            print(f"'{self.argument}' attacks itself, this argument is NOT credulously acceptable under Admissible Semantics.")
+        elif reason == "unattacked":
+            print(f"'{self.argument}' has no attackers, this argument is credulously acceptable under Admissible Semantics.")
+        elif "witness" not in result:
+            self.report(result["accepted"])
+        elif result["witness"] is not None:
+            print(f"'{self.argument}' is credulously acceptable under Admissible Semantics.")
+            print(tuple(result["witness"]))
+        else:
+            print(f"'{self.argument}' is NOT credulously acceptable under Admissible Semantics.")
 
     # Function to check the argument itself and optimize computation.
     def fast_check(self):
-        is_attacked = False
-        for relation in self.attacks:
-            if relation[0] == relation[1] and relation[1] == self.argument:  # Check loop to itself
-                print(f"'{self.argument}' attacks itself, this argument is NOT credulously acceptable under Admissible Semantics.")
-                return exit(0)
-            elif relation[0] == relation[1]: # Check for loop
-                self.arguments.discard(relation[0]) # Delete because it canot defend
-                
-            elif relation[1] == self.argument:
-                is_attacked = True
-                self.arguments.discard(relation[0]) # Delete because it attacks the argument
-
-        return is_attacked
-
-    # Function to check if an argument is credulously accepted under admissible semantics
-    def is_credulously_accepted(self):
+        # Drop self-attackers because they canot defend
+        self.candidates = self.arguments - set(self.af.to_names(self.af.self_attacking))
+        # Drop the attackers of the argument
+        attackers = self.af.attackers_of(self.argument)
+        self.candidates.difference_update(attackers)
+        return bool(attackers)
+
+    # Admissible set containing the argument, the argument first and the others sorted,
+    # or None if it is not credulously accepted under admissible semantics
+    def credulous_witness(self):
+        if self.engine == "enumerate":
+            witness = self.enumerate_witness()
+        elif self.engine == "sat":
+            import sat
+
+            witness = sat.find_witness(self.af, self.argument)
+        else:
+            witness = self.find_witness()
+        if witness is None:
+            return None
+        return [self.argument] + sorted(set(witness) - {self.argument})
+
+    # Credulous or skeptical acceptance under any of the supported semantics
+    def is_accepted(self):
+        if self.engine == "sat":
+            import sat
+
+            check = sat.is_skeptically_accepted if self.skeptical else sat.is_credulously_accepted
+        else:
+            check = is_skeptically_accepted if self.skeptical else is_credulously_accepted
+        return check(self.af, self.argument, self.semantics)
+
+    def mode(self):
+        return "skeptical" if self.skeptical else "credulous"
+
+    def report(self, accepted):
+        print(f"'{self.argument}' is {'' if accepted else 'NOT '}{self.mode()}ly acceptable under {self.semantics.capitalize()} Semantics.")
+
+    # Acceptance of every argument at once, printed as one table. Credulous statuses
+    # share the grounded labelling, the SCC cones and the witnesses found along the way.
+    def acceptance_table(self):
+        accepted = disk_cache.acceptance(
+            self.af, self.semantics, self.skeptical, self.compute_acceptance
+        )
+        width = max(len(name) for name in self.af.names + ["Argument"])
+        print(f"{'Argument':<{width}}  Accepted {self.mode()}ly ({self.semantics})")
+        for name, ok in zip(self.af.names, accepted):
+            print(f"{name:<{width}}  {'yes' if ok else 'no'}")
+        return dict(zip(self.af.names, accepted))
+
+    def compute_acceptance(self):
+        disk_cache.grounded_labelling(self.af)
+        if self.skeptical:
+            if self.engine == "sat":
+                import sat
+
+                check = sat.is_skeptically_accepted
+            else:
+                check = is_skeptically_accepted
+            return [check(self.af, name, self.semantics) for name in self.af.names]
+        find_witness = None
+        if self.engine == "sat":
+            import sat
+
+            find_witness = sat.find_witness
+        return credulous_acceptance(self.af, self.semantics, find_witness)
+
+    # Stream the extensions one per line, stopping after limit of them. With the
+    # cache on they are kept, and a later run prints the stored ones.
+    def list_extensions(self, semantics, limit=None):
+        query = ("extensions", semantics, limit)
+        cached = disk_cache.get(self.af, query) if disk_cache.enabled else None
+        if cached is not None:
+            found = json.loads(cached)
+            for extension in found:
+                print(tuple(extension))
+            return len(found)
+        found = []
+        count = 0
+        for extension in extensions(self.af, semantics, limit):
+            print(tuple(extension))
+            count += 1
+            if disk_cache.enabled:
+                found.append(extension)
+        if disk_cache.enabled:
+            disk_cache.put(self.af, query, json.dumps(found).encode())
+        return count
+
+    # Only the SCCs upstream of the argument can matter, so the search runs on that cone,
+    # reduced to its kernel: the grounded IN arguments of the cone are a witness for
+    # themselves, no admissible set contains an OUT one, and for the others a witness
+    # found on the kernel (twins expanded) plus the grounded IN arguments is admissible.
+    def find_witness(self):
+        cone = cone_framework(self.af, self.argument)
+        kernel = framework_kernel(cone)
+        name = kernel.argument(self.argument)
+        if name is None and kernel.status[self.argument] != IN:
+            return None
+        grounded = [cone.names[i] for i in grounded_extension(cone)]
+        if name is None:
+            return grounded
+        core = cone_framework(kernel.af, name)
+        witness = CredulousLabelling(core).find_witness(name)
+        return None if witness is None else grounded + kernel.expand(witness)
+
+    # Reference mode: test every subset containing the argument, kept for cross-checking the solver
+    def enumerate_witness(self, chunk_size=4096):
         subsets = self.subsets_containing_target()
-        for subset in subsets:
-            if self.is_conflict_free(subset):
-                if all(self.defends(subset, arg) for arg in subset):
-                    print(f"'{self.argument}' is credulously acceptable under Admissible Semantics.")
-                    print(subset)
-                    return True
-        print(f"'{self.argument}' is NOT credulously acceptable under Admissible Semantics.")
-        return False
+        while True:
+            chunk = list(islice(subsets, chunk_size))
+            if not chunk:
+                return None
+            if instrument.enabled:
+                instrument.count("credulous.subsets", len(chunk))
+            _, admissible = self.check_candidates(chunk)
+            for subset, ok in zip(chunk, admissible):
+                if ok:
+                    return subset
+
+    # Screen many candidate extensions (tuples of names) at once, returns
+    # (conflict_free, admissible) masks. With numpy the chunk is packed into uint64
+    # rows and checked by the matrix products, without it by the int bitset path.
+    def check_candidates(self, candidates):
+        # batch (and numpy) is only imported by the enumerate engine
+        from batch import check_candidates, np, pack_masks
+
+        masks = [self.af.mask(candidate) for candidate in candidates]
+        if np is not None:
+            return check_candidates(self.af, pack_masks(self.af, masks))
+        return check_candidates(self.af, masks)
 
     # Function to check if a set of arguments is conflict-free
     def is_conflict_free(self, s):
-        return not any((a, b) in self.attacks or (b, a) in self.attacks for a in s for b in s)
+        return self.af.is_conflict_free(self.af.mask(s))
 
     # Function to check if a set defends an argument
     def defends(self, s, argument):
-        attackers = {attacker for attacker, target in self.attacks if target == argument}
-        return all(any((defender, attacker) in self.attacks for defender in s) for attacker in attackers)
+        return self.af.defends(self.af.mask(s), self.af.index[argument])
     
-    # Function to generate all possible subsets with the given argument
+    # Function to generate all possible subsets with the given argument, smallest
+    # first; lazily, so that enumerate_witness only holds one chunk of them
     def subsets_containing_target(self):
-        self.arguments.discard(self.argument)
-        subsets = {tuple([self.argument])}
-        for i in range(1, len(self.arguments) + 1):
-            for combo in combinations(self.arguments - {self.argument}, i):
-                subsets.add(tuple([self.argument]) + combo)
-        return subsets
+        others = [
+            name for name in self.af.names if name in self.candidates and name != self.argument
+        ]
+        for i in range(len(others) + 1):
+            for combo in combinations(others, i):
+                yield (self.argument,) + combo
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("data_file", type=str, help="The path to the data file.")
-    parser.add_argument("argument", type=str, help="The claimed argument.")
+    parser.add_argument(
+        "argument", type=str, nargs="?", help="The claimed argument."
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["labelling", "enumerate", "sat"],
+        default="labelling",
+        help="Search engine: labelling backtracking (default), the reference subset enumeration or a SAT solver (pysat/pycosat if installed).",
+    )
+    parser.add_argument(
+        "--semantics",
+        choices=SEMANTICS,
+        default="admissible",
+        help="Semantics for the acceptance query (default: admissible).",
+    )
+    parser.add_argument(
+        "--skeptical",
+        action="store_true",
+        help="If set, check skeptical instead of credulous acceptance.",
+    )
+    parser.add_argument(
+        "--extensions",
+        choices=[s for s in SEMANTICS if s != "admissible"],
+        help="Print the extensions under these semantics instead of answering a query.",
+    )
+    parser.add_argument(
+        "--limit", type=int, help="Stop after this many extensions."
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Print the acceptance of every argument instead of answering a query.",
+    )
+    instrument.add_arguments(parser)
+    disk_cache.add_arguments(parser)
     args = parser.parse_args()
+    disk_cache.configure(args)
 
-    ArgumentationFramework(args.data_file, args.argument).compute()
+    if args.extensions is None and not args.all and args.argument is None:
+        parser.error("the argument is required unless --extensions or --all is given")
+    with instrument.session(args):
+        af = ArgumentationFramework(
+            args.data_file, args.argument, args.engine, args.semantics, args.skeptical
+        )
+        if args.extensions:
+            af.list_extensions(args.extensions, args.limit)
+        elif args.all:
+            af.acceptance_table()
+        else:
+            af.compute()
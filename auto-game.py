@@ -1,7 +1,16 @@
 import json
 import os
 import random
+import argparse
 from game import Game
+from parallel import iter_parallel
+from results_store import ResultsSink, game_result
+from framework import load_framework
+from policies import OPPONENT_POLICIES, opponent_policy
+from experiment import run_adaptive
+import strategy
+import instrument
+import disk_cache
 
 
 class AutoGame:
@@ -12,115 +21,312 @@ class AutoGame:
         save_graph_dir=None,
         save_res_dir=None,
         claimed_argument=None,
+        exact=False,
+        workers=1,
+        seed=None,
+        select_games=None,
+        stream=False,
+        opponent="random",
+        adaptive=False,
+        tolerance=0.05,
+        confidence=0.95,
+        batch_size=10,
     ):
         self.n_games = n_games
         self.data_path = data_path
         self.save_graph_dir = save_graph_dir
         self.save_res_dir = save_res_dir
         self.claimed_argument = claimed_argument
+        self.exact = exact
+        self.workers = workers
+        self.seed = seed
+        # Games are played headless; when save_graph_dir is set the records of the
+        # games accepted by select_games(record) are rendered after the run
+        self.select_games = select_games
+        self.records = []
+        # With stream=True every game is appended to results.jsonl as soon as it ends,
+        # instead of one directory per game and a results.json written at the end
+        self.stream = stream
+        self.sink = None
         self.results = {}
+        # Opponent policy by name (policies.OPPONENT_POLICIES); the random one draws
+        # from the random module, so --seed replays the same games as before
+        self.opponent_name = opponent
+        self.opponent = opponent_policy(opponent)
+        # With adaptive=True, n_games is an upper bound: the games of a file are played
+        # in batches until the confidence interval on the proponent win rate is within
+        # +-tolerance, and the summaries go to adaptive_results.json
+        self.adaptive = adaptive
+        self.tolerance = tolerance
+        self.confidence = confidence
+        self.batch_size = batch_size
+        self.summaries = {}
 
     @staticmethod
     def choose_proponent_move(game, options):
-        best_argument = None
-        best_path_length = float("inf")
-
-        def dfs(argument, path, visited_proponent, visited_opponent):
-            nonlocal best_argument, best_path_length
-
-            # Losing conditions
-            if (
-                argument in visited_opponent
-                or not game.G.predecessors(argument)
-                or argument in game.G.predecessors(argument)
-            ):
-                return False
-
-            # Winning condition
-            if all(pred in visited_proponent for pred in game.G.predecessors(argument)):
-                if len(path) < best_path_length:
-                    best_argument = path[0]
-                    best_path_length = len(path)
-                return True
-
-            for next_argument in game.G.predecessors(argument):
-                if next_argument not in visited_proponent:
-                    visited_proponent.add(next_argument)
-                    path.append(next_argument)
-                    if dfs(next_argument, path, visited_proponent, visited_opponent):
-                        return True
-                    path.pop()
-                    visited_proponent.remove(next_argument)
-
-            return False
-
-        for argument in options:
-            dfs(argument, [argument], {argument}, set(game.opponent_arguments))
-
-        return (
-            best_argument if best_argument else options[0]
-        )  # Fallback to the first option if no winning path is found
+        # Shares the framework's strategy cache with every other game on the same file
+        return strategy.choose_proponent_move(
+            game.af, options, game.opponent_mask, claim=game.claimed_argument
+        )
 
-    @staticmethod
-    def choose_opponent_move(_, options):
-        return random.choice(options)
+    def choose_opponent_move(self, game, options):
+        return self.opponent(game, options)
 
     def play_games(self):
         # Check if data_path is a directory or a file
         if os.path.isdir(self.data_path):
             # If it's a directory, iterate over all JSON files
-            for filename in os.listdir(self.data_path):
-                if filename.endswith(".json"):
-                    self.play_game(
-                        os.path.join(self.data_path, filename), self.claimed_argument
-                    )
+            data_files = [
+                os.path.join(self.data_path, filename)
+                for filename in os.listdir(self.data_path)
+                if filename.endswith(".json")
+            ]
         else:
             # If it's a file, just play the game
-            self.play_game(self.data_path, self.claimed_argument)
+            data_files = [self.data_path]
+
+        if self.stream and not self.exact:
+            self.sink = ResultsSink(os.path.join(self.save_res_dir, "results.jsonl"))
+
+        # Adaptive runs decide after each batch whether to go on, so they stay sequential
+        if self.workers != 1 and not self.exact and not self.adaptive:
+            self.play_parallel(data_files)
+        else:
+            if self.seed is not None:
+                random.seed(self.seed)
+            for data_file in data_files:
+                self.play_game(data_file, self.claimed_argument)
         # Save results
         self.write_results()
+        if self.save_graph_dir:
+            from render import render_games
 
+            render_games(self.records, self.save_graph_dir, workers=self.workers)
+
+    def is_selected(self, record):
+        return self.select_games is None or self.select_games(record)
+
+    def play_parallel(self, data_files):
+        chunks = iter_parallel(
+            data_files,
+            self.n_games,
+            self.claimed_argument,
+            self.workers,
+            0 if self.seed is None else self.seed,
+            None if self.sink else self.save_res_dir,
+            keep_records=bool(self.save_graph_dir or self.sink),
+            opponent=self.opponent_name,
+        )
+        for key, chunk_results, records in chunks:
+            if self.sink:
+                for result, record in zip(chunk_results, records):
+                    self.sink.write(game_result(key, result["game_number"], record))
+            else:
+                self.results.setdefault(key, []).extend(chunk_results)
+            if self.save_graph_dir:
+                self.records.extend(filter(self.is_selected, records))
+        for games in self.results.values():
+            games.sort(key=lambda game: game["game_number"])
+
+    @instrument.timed("results.write_summary")
     def write_results(self):
-        with open(os.path.join(self.save_res_dir, "results.json"), "w") as f:
+        if self.summaries:
+            with open(os.path.join(self.save_res_dir, "adaptive_results.json"), "w") as f:
+                json.dump(self.summaries, f)
+        if self.sink:
+            self.sink.close()
+            return
+        filename = "theoretical_results.json" if self.exact else "results.json"
+        with open(os.path.join(self.save_res_dir, filename), "w") as f:
             json.dump(self.results, f)
 
+    # Exact proponent win rate from the strategy table, averaged over the claimed
+    # arguments instead of sampled. It is the rate of the table's optimal proponent
+    # against the random opponent, not of the DFS proponent the sampled games use.
+    def theoretical_results(self, data_file, claimed_argument):
+        values = disk_cache.claim_values(load_framework(data_file), claimed_argument)
+        return {
+            "optimal_play_win_rate": sum(p for p, _ in values.values()) / len(values),
+            "winning_claims": [c for c, (_, forced) in values.items() if forced],
+        }
+
     def play_game(self, data_file, claimed_argument):
-        for n in range(self.n_games):
-            game = Game(
-                data_file=data_file,
-                claimed_argument=claimed_argument,
-                verbose=False,
-                save_graph_dir=self.save_graph_dir,
-                save_res_dir=self.save_res_dir,
-                add_game_text=True,
-                choose_proponent_move=self.choose_proponent_move,
-                choose_opponent_move=self.choose_opponent_move,
-            )
-            # If claimed_argument is None, select a random node from the graph
-            game.claimed_argument = (
-                random.choice(list(game.G.nodes))
-                if claimed_argument is None
-                else claimed_argument
-            )
-            game.play()
-            # Use the base name of the data file as the key
+        if self.exact:
             key = os.path.basename(data_file)
-            if key not in self.results:
-                self.results[key] = []
-            self.results[key].append(
+            try:
+                self.results[key] = self.theoretical_results(data_file, claimed_argument)
+                return
+            except strategy.TableTooLarge as e:
+                # Too big for the table: fall back on sampled games (DFS proponent)
+                print(f"{key}: {e} Playing {self.n_games} games instead.")
+            winners = [
+                self.play_one(data_file, claimed_argument, n)[0]
+                for n in range(self.n_games)
+            ]
+            self.results[key] = {
+                "sampled_win_rate": (
+                    winners.count("Proponent") / len(winners) if winners else None
+                ),
+                "games": self.results.pop(key, []),
+            }
+            return
+        if self.adaptive:
+            self.summaries[os.path.basename(data_file)] = run_adaptive(
+                lambda n: self.play_one(data_file, claimed_argument, n),
+                self.batch_size,
+                self.tolerance,
+                self.confidence,
+                self.n_games,
+            )
+            return
+        for n in range(self.n_games):
+            self.play_one(data_file, claimed_argument, n)
+
+    # Plays and records game number n, returns (winner, deterministic): deterministic
+    # when every later game would replay this one, i.e. the claim is fixed and the
+    # opponent never had to draw between different moves
+    def play_one(self, data_file, claimed_argument, n):
+        game = Game(
+            data_file=data_file,
+            claimed_argument=claimed_argument,
+            verbose=False,
+            save_res_dir=None if self.sink else self.save_res_dir,
+            add_game_text=True,
+            choose_proponent_move=self.choose_proponent_move,
+            choose_opponent_move=self.choose_opponent_move,
+            headless=True,
+        )
+        # If claimed_argument is None, select a random node from the graph
+        game.claimed_argument = (
+            random.choice(game.af.names)
+            if claimed_argument is None
+            else claimed_argument
+        )
+        if not self.opponent.deterministic:
+            self.opponent.branched = False
+        game.play()
+        if self.save_graph_dir and self.is_selected(game.record()):
+            self.records.append(game.record())
+        # Use the base name of the data file as the key
+        key = os.path.basename(data_file)
+        if self.sink:
+            self.sink.write(game_result(key, n, game.record()))
+        else:
+            self.results.setdefault(key, []).append(
                 {
                     "game_number": n,
                     "winner": game.winner,  # assuming game object has a winner attribute
                 }
             )
+        deterministic = claimed_argument is not None and (
+            self.opponent.deterministic or not self.opponent.branched
+        )
+        return game.winner, deterministic
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play many argumentation games.")
+    parser.add_argument(
+        "data_path",
+        nargs="?",
+        default="Argumentation_Framework_tests",
+        help="A data file or a directory of them.",
+    )
+    parser.add_argument(
+        "--n_games", type=int, default=100, help="Number of games per file."
+    )
+    parser.add_argument(
+        "--claimed_argument",
+        type=str,
+        help="The claimed argument, a random one per game if not set.",
+    )
+    parser.add_argument(
+        "--save_graph", type=str, help="If set, save the graphs to this directory."
+    )
+    parser.add_argument(
+        "--save_res", type=str, default="test_dir", help="Directory for the results."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes, 0 for one per CPU (default: 1).",
+    )
+    parser.add_argument(
+        "--seed", type=int, help="Seed for the random opponent and claims."
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="If set, append every game to results.jsonl as it finishes.",
+    )
+    parser.add_argument(
+        "--render_winner",
+        choices=["Proponent", "Opponent"],
+        help="With --save_graph, only render the games won by this side.",
+    )
+    parser.add_argument(
+        "--exact",
+        action="store_true",
+        help="If set, compute the exact win rates under optimal proponent play instead "
+        "of playing games (falls back to playing games when the game is too big to be "
+        f"solved, past {strategy.MAX_POSITIONS} positions).",
+    )
+    parser.add_argument(
+        "--opponent",
+        choices=sorted(OPPONENT_POLICIES),
+        default="random",
+        help="Opponent policy (default: random).",
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="If set, stop each file once the win rate is known to +-tolerance, "
+        "n_games being the maximum.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.05,
+        help="Half-width of the confidence interval for --adaptive (default: 0.05).",
+    )
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=0.95,
+        help="Confidence level for --adaptive (default: 0.95).",
+    )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=10,
+        help="Games played between two checks with --adaptive (default: 10).",
+    )
+    instrument.add_arguments(parser)
+    disk_cache.add_arguments(parser)
+    args = parser.parse_args()
+    disk_cache.configure(args)
+
     auto_game = AutoGame(
-        n_games=100,
-        data_path="Argumentation_Framework_tests",  # directory path
-        # save_graph_dir="test_dir",  # save dir path
-        save_res_dir="test_dir",  # save dir path
-        claimed_argument=None,  # No claimed argument provided
+        n_games=args.n_games,
+        data_path=args.data_path,
+        save_graph_dir=args.save_graph,
+        save_res_dir=args.save_res,
+        claimed_argument=args.claimed_argument,
+        exact=args.exact,
+        workers=args.workers or None,
+        seed=args.seed,
+        stream=args.stream,
+        opponent=args.opponent,
+        adaptive=args.adaptive,
+        tolerance=args.tolerance,
+        confidence=args.confidence,
+        batch_size=args.batch_size,
+        select_games=(
+            (lambda record: record["winner"] == args.render_winner)
+            if args.render_winner
+            else None
+        ),
     )
-    auto_game.play_games()
+    with instrument.session(args):
+        auto_game.play_games()
@@ -0,0 +1,83 @@
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, the int bitset path below works without it
+    np = None
+
+from framework import iter_bits
+
+
+# Batched conflict-freeness / admissibility checks for many candidate sets at once.
+#
+# candidates can be
+#   - a numpy bool matrix, one row per candidate and one column per argument id
+#   - a numpy uint64 matrix of packed rows (bit i of the row = argument id i)
+#   - any iterable of int bitsets or of iterables of argument names
+# Returns (conflict_free, admissible); numpy bool vectors for numpy input, lists otherwise.
+def check_candidates(af, candidates):
+    if np is not None and isinstance(candidates, np.ndarray):
+        return check_matrix(af, unpack_rows(af, candidates))
+    masks = [c if isinstance(c, int) else af.mask(c) for c in candidates]
+    return check_masks(af, masks)
+
+
+def check_masks(af, masks):
+    conflict_free = []
+    admissible = []
+    for mask in masks:
+        attacked = af.attacked_by(mask)
+        ok = not attacked & mask
+        conflict_free.append(ok)
+        admissible.append(
+            ok and all(af.defends(mask, i, attacked) for i in iter_bits(mask))
+        )
+    return conflict_free, admissible
+
+
+# Two boolean matrix products against the attack adjacency matrix A (A[i, j]: i attacks j):
+#   attacked    = S @ A       arguments attacked by each candidate
+#   undefended  = ~attacked @ A   arguments attacked by something the candidate does not attack
+def check_matrix(af, rows):
+    adjacency = adjacency_matrix(af)
+    attacked = rows @ adjacency
+    conflict_free = ~(attacked & rows).any(axis=1)
+    undefended = ~attacked @ adjacency
+    admissible = conflict_free & ~(undefended & rows).any(axis=1)
+    return conflict_free, admissible
+
+
+def adjacency_matrix(af):
+    adjacency = getattr(af, "_adjacency", None)
+    if adjacency is None:
+        adjacency = np.zeros((af.n, af.n), dtype=bool)
+        adjacency[
+            np.repeat(np.arange(af.n), np.diff(af.target_offsets)),
+            np.frombuffer(af.target_ids, dtype=np.int32),
+        ] = True
+        af._adjacency = adjacency
+    return adjacency
+
+
+def unpack_rows(af, rows):
+    if rows.dtype == bool:
+        if rows.ndim != 2 or rows.shape[1] != af.n:
+            raise ValueError(f"Expected a (candidates, {af.n}) bool matrix, got {rows.shape}.")
+        return rows
+    if rows.dtype != np.uint64:
+        raise ValueError(f"Unsupported candidate dtype {rows.dtype}, use bool or uint64.")
+    words = (af.n + 63) // 64
+    if rows.ndim != 2 or rows.shape[1] != words:
+        raise ValueError(f"Expected a (candidates, {words}) uint64 matrix, got {rows.shape}.")
+    bits = np.unpackbits(
+        np.ascontiguousarray(rows, dtype="<u8").view(np.uint8), axis=1, bitorder="little"
+    )
+    return bits[:, : af.n].astype(bool)
+
+
+# Pack int bitsets into uint64 rows accepted by check_candidates
+def pack_masks(af, masks):
+    words = (af.n + 63) // 64
+    rows = np.zeros((len(masks), words), dtype=np.uint64)
+    for r, mask in enumerate(masks):
+        for w in range(words):
+            rows[r, w] = (mask >> (64 * w)) & 0xFFFFFFFFFFFFFFFF
+    return rows
@@ -0,0 +1,258 @@
+import io
+import os
+import sys
+import json
+import time
+import runpy
+import random
+import argparse
+import platform
+import tempfile
+import contextlib
+import subprocess
+import tracemalloc
+from framework import Framework
+from generators import SHAPES, generate, save
+from semantics import is_credulously_accepted
+import strategy
+
+# Scaling benchmarks on synthetic frameworks (see generators.py). Every phase is
+# timed on a fresh framework, so no cache is shared between phases or runs, then run
+# a second time under tracemalloc for its peak memory (tracing slows it down, so the
+# two are measured separately). The JSON report can be compared with --compare.
+
+PHASES = ("startup", "load", "credulous", "strategy", "autogame")
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+AutoGame = runpy.run_path(os.path.join(ROOT, "auto-game.py"))["AutoGame"]
+
+
+def measure(setup, run, memory=True):
+    state = setup()
+    start = time.perf_counter()
+    count = run(state)
+    seconds = time.perf_counter() - start
+    peak_memory = None
+    if memory:
+        state = setup()
+        tracemalloc.start()
+        run(state)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {"seconds": seconds, "peak_memory": peak_memory, "count": count}
+
+
+def write_framework(data, directory):
+    fd, path = tempfile.mkstemp(suffix=".json", dir=directory)
+    os.close(fd)
+    save(data, path)
+    return path
+
+
+# Cold start of the command-line entry points: one new interpreter per call
+def run_startup(state):
+    path, argument, directory = state
+    commands = [
+        ["AF_semantics.py", path, argument],
+        ["auto-game.py", path, "--n_games", "1", "--save_res", directory, "--stream"],
+    ]
+    for command in commands:
+        subprocess.run(
+            [sys.executable, os.path.join(ROOT, command[0])] + command[1:],
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+    return len(commands)
+
+
+def run_load(path):
+    Framework.from_json(path)
+    return 1
+
+
+def run_credulous(state):
+    af, queries = state
+    for name in queries:
+        is_credulously_accepted(af, name)
+    return len(queries)
+
+
+# Proponent move choices as in a game: options are the attackers of an argument,
+# against a few random opponent arguments
+def run_strategy(state):
+    af, positions = state
+    for options, opponent_arguments in positions:
+        strategy.choose_proponent_move(af, options, opponent_arguments)
+    return len(positions)
+
+
+def run_autogame(state):
+    path, n_games, seed, directory = state
+    auto_game = AutoGame(
+        n_games=n_games, data_path=path, save_res_dir=directory, seed=seed, stream=True
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        auto_game.play_games()
+    return n_games
+
+
+def benchmark_case(shape, size, density, seed, queries, n_games, phases, memory, directory):
+    data = generate(shape, size, density, seed)
+    path = write_framework(data, directory)
+    af = Framework.from_json(path)
+    rng = random.Random(seed)
+    query_names = [rng.choice(af.names) for _ in range(queries)]
+    positions = []
+    for name in query_names:
+        options = [af.names[i] for i in af.attackers(af.index[name])] or [name]
+        opponent_arguments = rng.sample(af.names, min(3, af.n))
+        positions.append((options, opponent_arguments))
+
+    setups = {
+        "startup": (lambda: (path, query_names[0], directory), run_startup),
+        "load": (lambda: path, run_load),
+        "credulous": (lambda: (Framework.from_json(path), query_names), run_credulous),
+        "strategy": (lambda: (Framework.from_json(path), positions), run_strategy),
+        # A new file per run, so AutoGame does not reuse the loaded framework
+        "autogame": (
+            lambda: (write_framework(data, directory), n_games, seed, directory),
+            run_autogame,
+        ),
+    }
+    results = []
+    for phase in phases:
+        setup, run = setups[phase]
+        result = {
+            "shape": shape,
+            "size": size,
+            "density": density,
+            "seed": seed,
+            "n_attacks": af.n_attacks,
+            "phase": phase,
+        }
+        # The startup runs happen in child processes, out of tracemalloc's reach
+        result.update(measure(setup, run, memory and phase != "startup"))
+        results.append(result)
+        print(format_result(result), file=sys.stderr)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(
+    shapes, sizes, density=None, seed=0, queries=20, n_games=20, phases=PHASES, memory=True
+):
+    with tempfile.TemporaryDirectory() as directory:
+        results = [
+            result
+            for shape in shapes
+            for size in sizes
+            for result in benchmark_case(
+                shape, size, density, seed, queries, n_games, phases, memory, directory
+            )
+        ]
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "parameters": {
+            "shapes": list(shapes),
+            "sizes": list(sizes),
+            "density": density,
+            "seed": seed,
+            "queries": queries,
+            "n_games": n_games,
+        },
+        "results": results,
+    }
+
+
+def format_result(result):
+    memory = (
+        "" if result["peak_memory"] is None else f"  {result['peak_memory'] / 1024:10.1f} KiB"
+    )
+    return (
+        f"{result['shape']:>12} {result['size']:>6} {result['n_attacks']:>7} "
+        f"{result['phase']:>10} {result['seconds']:10.4f} s{memory}"
+    )
+
+
+def result_key(result):
+    return (result["shape"], result["size"], result["density"], result["seed"], result["phase"])
+
+
+# Print the time of every case of the report next to the one in a previous report
+def compare(report, previous):
+    old = {result_key(result): result for result in previous["results"]}
+    print(f"Compared with {previous.get('commit')} ({previous.get('time')})")
+    for result in report["results"]:
+        before = old.get(result_key(result))
+        if before is None:
+            continue
+        ratio = before["seconds"] / result["seconds"] if result["seconds"] else float("inf")
+        print(
+            f"{result['shape']:>12} {result['size']:>6} {result['phase']:>10} "
+            f"{before['seconds']:10.4f} s -> {result['seconds']:10.4f} s  x{ratio:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the solvers and games.")
+    parser.add_argument(
+        "--shapes",
+        nargs="+",
+        choices=sorted(SHAPES),
+        default=sorted(SHAPES),
+        help="Framework shapes to generate.",
+    )
+    parser.add_argument(
+        "--sizes", nargs="+", type=int, default=[25, 50, 100], help="Numbers of arguments."
+    )
+    parser.add_argument("--density", type=float, help="Shape-specific attack density.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+    parser.add_argument(
+        "--queries", type=int, default=20, help="Credulous/strategy queries per framework."
+    )
+    parser.add_argument(
+        "--n_games", type=int, default=20, help="AutoGame games per framework."
+    )
+    parser.add_argument(
+        "--phases", nargs="+", choices=PHASES, default=PHASES, help="Phases to run."
+    )
+    parser.add_argument(
+        "--no_memory", action="store_true", help="If set, skip the peak memory runs."
+    )
+    parser.add_argument("--output", type=str, help="Write the JSON report to this file.")
+    parser.add_argument(
+        "--compare", type=str, help="A previous JSON report to compare the times with."
+    )
+    args = parser.parse_args()
+
+    report = run_benchmarks(
+        args.shapes,
+        args.sizes,
+        args.density,
+        args.seed,
+        args.queries,
+        args.n_games,
+        args.phases,
+        not args.no_memory,
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r") as f:
+            compare(report, json.load(f))
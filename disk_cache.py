@@ -0,0 +1,278 @@
+import os
+import atexit
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import argparse
+from grounded import grounded_labelling as compute_grounded_labelling
+import strategy
+
+# Persistent cache of solved frameworks, shared by every run and every process.
+# Entries are keyed by a hash of the framework content (the argument names in id
+# order and both deduplicated attack arrays, in the order the game lists them, so
+# descriptions, formatting and repeated attacks do not matter) and by the query,
+# e.g. ("acceptance", "preferred", "credulous"). Values are zlib-compressed: bool
+# vectors as bitsets, labels as bytes, anything else as JSON.
+#
+# Storage is one SQLite database in WAL mode: concurrent readers and writers (e.g.
+# several sweeps at once, or worker processes) are serialized by SQLite itself, and
+# each process opens its own connection. Past max_bytes, the least recently used
+# entries are evicted. Reads only read: the hits are recorded in memory and written
+# in batches (every TOUCH_BATCH hits, with the next put, and at exit), so readers
+# never wait on each other for the write lock. The total size is kept up to date by
+# triggers in a one-row table, instead of summing the entries on every put.
+#
+# Off by default; the CLIs turn it on with --cache [DIR].
+
+DEFAULT_DIRECTORY = os.environ.get(
+    "AF_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "argumentation")
+)
+DATABASE = "cache.sqlite"
+TOUCH_BATCH = 256
+
+enabled = False
+directory = None
+max_bytes = 256 * 2**20
+_connection = None
+_pid = None
+_touched = {}  # (framework key, query key) -> time of the last hit, not yet written
+
+
+def enable(path=None, size=None):
+    global enabled, directory, max_bytes, _connection
+    enabled = True
+    directory = path or DEFAULT_DIRECTORY
+    if size is not None:
+        max_bytes = size
+    _connection = None
+
+
+def disable():
+    global enabled, _connection
+    enabled = False
+    if _connection is not None and _pid == os.getpid():
+        flush()
+        _connection.close()
+    _connection = None
+
+
+# One connection per process: a connection must not cross a fork
+def connection():
+    global _connection, _pid
+    if _connection is None or _pid != os.getpid():
+        os.makedirs(directory, exist_ok=True)
+        _connection = sqlite3.connect(os.path.join(directory, DATABASE), timeout=60)
+        _connection.execute("PRAGMA journal_mode=WAL")
+        _connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries (framework TEXT, query TEXT, value BLOB,"
+            " size INTEGER, used REAL, PRIMARY KEY (framework, query))"
+        )
+        _connection.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries (used)")
+        with _connection:
+            _connection.execute(
+                "CREATE TABLE IF NOT EXISTS total (id INTEGER PRIMARY KEY CHECK (id = 0),"
+                " size INTEGER)"
+            )
+            _connection.execute(
+                "INSERT OR IGNORE INTO total SELECT 0, COALESCE(SUM(size), 0) FROM entries"
+                " WHERE NOT EXISTS (SELECT 1 FROM total)"
+            )
+            _connection.execute(
+                "CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries"
+                " BEGIN UPDATE total SET size = size + NEW.size; END"
+            )
+            _connection.execute(
+                "CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries"
+                " BEGIN UPDATE total SET size = size + NEW.size - OLD.size; END"
+            )
+            _connection.execute(
+                "CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries"
+                " BEGIN UPDATE total SET size = size - OLD.size; END"
+            )
+        if _pid is None:
+            atexit.register(flush)
+        _touched.clear()
+        _pid = os.getpid()
+    return _connection
+
+
+# Content hash of the framework, computed once per framework object
+def framework_key(af):
+    key = getattr(af, "_cache_key", None)
+    if key is None:
+        digest = hashlib.sha256(json.dumps(af.names).encode())
+        digest.update(memoryview(af.target_offsets).cast("B"))
+        digest.update(memoryview(af.target_ids).cast("B"))
+        digest.update(memoryview(af.attacker_offsets).cast("B"))
+        digest.update(memoryview(af.attacker_ids).cast("B"))
+        key = af._cache_key = digest.hexdigest()
+    return key
+
+
+def query_key(query):
+    return json.dumps(list(query))
+
+
+def get(af, query):
+    key = (framework_key(af), query_key(query))
+    row = connection().execute(
+        "SELECT value FROM entries WHERE framework = ? AND query = ?", key
+    ).fetchone()
+    if row is None:
+        return None
+    _touched[key] = time.time()
+    if len(_touched) >= TOUCH_BATCH:
+        with connection() as db:
+            write_touched(db)
+    return zlib.decompress(row[0])
+
+
+def put(af, query, data):
+    value = zlib.compress(data)
+    if len(value) > max_bytes:
+        return
+    with connection() as db:
+        write_touched(db)
+        db.execute(
+            "INSERT INTO entries VALUES (?, ?, ?, ?, ?) ON CONFLICT (framework, query)"
+            " DO UPDATE SET value = excluded.value, size = excluded.size,"
+            " used = excluded.used",
+            (framework_key(af), query_key(query), value, len(value), time.time()),
+        )
+        total = db.execute("SELECT size FROM total").fetchone()[0]
+        if total > max_bytes:
+            evict(db, total - max_bytes)
+
+
+# Write the recorded hits as last use times (in the caller's transaction)
+def write_touched(db):
+    if _touched:
+        db.executemany(
+            "UPDATE entries SET used = ? WHERE framework = ? AND query = ?",
+            [(used, framework, query) for (framework, query), used in _touched.items()],
+        )
+        _touched.clear()
+
+
+def flush():
+    if _connection is not None and _pid == os.getpid() and _touched:
+        with _connection as db:
+            write_touched(db)
+
+
+# Drop the least recently used entries until at least excess bytes are freed
+def evict(db, excess):
+    freed = 0
+    stale = []
+    rows = db.execute("SELECT rowid, size FROM entries ORDER BY used")
+    for rowid, size in rows:
+        if freed >= excess:
+            break
+        stale.append((rowid,))
+        freed += size
+    rows.close()
+    db.executemany("DELETE FROM entries WHERE rowid = ?", stale)
+
+
+# Value of the query from the cache, or computed (and stored) when missing.
+# encode(value) -> bytes and decode(bytes) -> value default to JSON.
+def cached(af, query, compute, encode=None, decode=None):
+    if not enabled:
+        return compute()
+    data = get(af, query)
+    if data is not None:
+        return decode(data) if decode else json.loads(data)
+    value = compute()
+    put(af, query, encode(value) if encode else json.dumps(value).encode())
+    return value
+
+
+def pack_bools(values):
+    bits = bytearray((len(values) + 7) // 8)
+    for i, value in enumerate(values):
+        if value:
+            bits[i >> 3] |= 1 << (i & 7)
+    return bytes(bits)
+
+
+def unpack_bools(data, n):
+    return [bool(data[i >> 3] >> (i & 7) & 1) for i in range(n)]
+
+
+# Grounded labelling (labelling.IN/OUT/UNDEC per argument id), also seeded into the
+# framework's in-memory cache so that the solvers reuse it
+def grounded_labelling(af):
+    if getattr(af, "_grounded", None) is not None or not enabled:
+        return compute_grounded_labelling(af)
+    labels = cached(
+        af, ("grounded",), lambda: compute_grounded_labelling(af), bytes, bytearray
+    )
+    af._grounded = labels
+    return labels
+
+
+# Acceptance of every argument (list indexed by argument id)
+def acceptance(af, semantics, skeptical, compute):
+    return cached(
+        af,
+        ("acceptance", semantics, "skeptical" if skeptical else "credulous"),
+        compute,
+        pack_bools,
+        lambda data: unpack_bools(data, af.n),
+    )
+
+
+# {claim: (win probability, forced win)} from the exact game solution, for one
+# claimed argument or (claim=None) for all of them
+def claim_values(af, claim=None):
+    claims = af.names if claim is None else [claim]
+
+    def compute():
+        table = strategy.strategy_table(af)
+        return [table.claim_value(name) for name in claims]
+
+    values = cached(af, ("strategy", claim), compute)
+    return {name: tuple(value) for name, value in zip(claims, values)}
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const=DEFAULT_DIRECTORY,
+        help=f"If set, reuse results solved by earlier runs, kept in this directory "
+        f"(default: {DEFAULT_DIRECTORY}).",
+    )
+    parser.add_argument(
+        "--cache_size",
+        type=int,
+        default=256,
+        help="Size limit of the result cache in MiB (default: 256).",
+    )
+
+
+def configure(args):
+    if args.cache:
+        enable(args.cache, args.cache_size * 2**20)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or clear the result cache.")
+    parser.add_argument(
+        "directory", nargs="?", default=DEFAULT_DIRECTORY, help="The cache directory."
+    )
+    parser.add_argument("--clear", action="store_true", help="If set, drop every entry.")
+    args = parser.parse_args()
+
+    enable(args.directory)
+    with connection() as db:
+        if args.clear:
+            db.execute("DELETE FROM entries")
+        entries, size, frameworks = db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COUNT(DISTINCT framework) FROM entries"
+        ).fetchone()
+    if args.clear:
+        connection().execute("VACUUM")
+    print(f"{entries} entries for {frameworks} frameworks, {size / 2**20:.1f} MiB")
@@ -0,0 +1,194 @@
+from collections import deque
+from framework import Framework
+from labelling import IN, OUT, UNDEC
+from semantics import is_credulously_accepted, is_skeptically_accepted
+
+
+# Argumentation framework that changes a few attacks at a time. The grounded labels
+# and the cached acceptance answers are kept up to date incrementally: the answer
+# for an argument only depends on the arguments upstream of it (every semantics
+# except stable is directional), so a change at an argument only relabels, and only
+# forgets the answers of, the arguments reachable from it.
+class DynamicFramework:
+    def __init__(self, arguments=(), attacks=()):
+        if isinstance(arguments, dict):
+            self.descriptions = dict(arguments)
+        else:
+            self.descriptions = {name: name for name in arguments}
+        self.attackers = {name: set() for name in self.descriptions}
+        self.targets = {name: set() for name in self.descriptions}
+        self.labels = {}
+        self.accepted = {}  # (argument, semantics, skeptical) -> bool
+        self._framework = None
+        for attacker, target in attacks:
+            for name in (attacker, target):
+                if name not in self.descriptions:
+                    self.add_argument(name)
+            self.attackers[target].add(attacker)
+            self.targets[attacker].add(target)
+        self.relabel(set(self.descriptions))
+
+    @classmethod
+    def from_json(cls, data_file):
+        af = Framework.from_json(data_file)
+        return cls(dict(zip(af.names, af.descriptions)), af.edges())
+
+    def add_argument(self, name, description=None):
+        if name in self.descriptions:
+            raise ValueError(f"The argument '{name}' is already in the AF.")
+        self.descriptions[name] = name if description is None else description
+        self.attackers[name] = set()
+        self.targets[name] = set()
+        self.labels[name] = IN  # unattacked
+        self.changed(set())
+
+    def remove_argument(self, name):
+        self.check(name)
+        region = self.downstream(self.targets[name] - {name})
+        for attacker in self.attackers.pop(name):
+            self.targets[attacker].discard(name)
+        for target in self.targets.pop(name):
+            self.attackers[target].discard(name)
+        del self.descriptions[name]
+        del self.labels[name]
+        region.discard(name)
+        self.forget(name)
+        self.changed(region)
+
+    def add_attack(self, attacker, target):
+        self.check(attacker)
+        self.check(target)
+        if attacker in self.attackers[target]:
+            return
+        self.attackers[target].add(attacker)
+        self.targets[attacker].add(target)
+        self.changed(self.downstream([target]))
+
+    def remove_attack(self, attacker, target):
+        self.check(attacker)
+        self.check(target)
+        if attacker not in self.attackers[target]:
+            raise ValueError(f"'{attacker}' does not attack '{target}'.")
+        self.attackers[target].discard(attacker)
+        self.targets[attacker].discard(target)
+        self.changed(self.downstream([target]))
+
+    def check(self, name):
+        if name not in self.descriptions:
+            raise ValueError(f"The argument '{name}' does not appear in the AF.")
+
+    # Arguments reachable from the given ones (included) along attacks
+    def downstream(self, names):
+        region = set(names)
+        queue = deque(region)
+        while queue:
+            for target in self.targets[queue.popleft()]:
+                if target not in region:
+                    region.add(target)
+                    queue.append(target)
+        return region
+
+    # Arguments the given one depends on: itself and everything that reaches it
+    def upstream(self, name):
+        cone = {name}
+        queue = deque(cone)
+        while queue:
+            for attacker in self.attackers[queue.popleft()]:
+                if attacker not in cone:
+                    cone.add(attacker)
+                    queue.append(attacker)
+        return cone
+
+    def changed(self, region):
+        self._framework = None
+        self.relabel(region)
+        for key in list(self.accepted):
+            # Stable semantics is not directional, any change can flip its answers
+            if key[0] in region or key[1] == "stable":
+                del self.accepted[key]
+
+    def forget(self, name):
+        for key in [key for key in self.accepted if key[0] == name]:
+            del self.accepted[key]
+
+    # Grounded labels of a downstream-closed region, the labels outside it being fixed.
+    # Same propagation as grounded.grounded_labelling, restricted to the region.
+    def relabel(self, region):
+        labels = self.labels
+        for name in region:
+            labels[name] = UNDEC
+        remaining = {
+            name: sum(1 for a in self.attackers[name] if a in region or labels[a] != OUT)
+            for name in region
+        }
+        queue = deque()
+
+        def set_out(name):
+            labels[name] = OUT
+            for target in self.targets[name]:
+                remaining[target] -= 1
+                if remaining[target] == 0 and labels[target] == UNDEC:
+                    labels[target] = IN
+                    queue.append(target)
+
+        for name in region:
+            if labels[name] != UNDEC:
+                continue
+            if remaining[name] == 0:
+                labels[name] = IN
+                queue.append(name)
+            elif any(a not in region and labels[a] == IN for a in self.attackers[name]):
+                set_out(name)
+        while queue:
+            for target in self.targets[queue.popleft()]:
+                if labels[target] == UNDEC:
+                    set_out(target)
+
+    def grounded_label(self, name):
+        self.check(name)
+        return self.labels[name]
+
+    def grounded_extension(self):
+        return [name for name, label in self.labels.items() if label == IN]
+
+    # Snapshot as a (static) framework.Framework, rebuilt after a change
+    def framework(self):
+        if self._framework is None:
+            self._framework = Framework(
+                self.descriptions,
+                [(a, t) for t, attackers in self.attackers.items() for a in attackers],
+            )
+        return self._framework
+
+    def is_credulously_accepted(self, name, semantics="admissible"):
+        return self.is_accepted(name, semantics, False)
+
+    def is_skeptically_accepted(self, name, semantics="preferred"):
+        return self.is_accepted(name, semantics, True)
+
+    def is_accepted(self, name, semantics, skeptical):
+        self.check(name)
+        key = (name, semantics, skeptical)
+        accepted = self.accepted.get(key)
+        if accepted is not None:
+            return accepted
+
+        label = self.labels[name]
+        if semantics == "grounded" or (semantics != "stable" and label != UNDEC):
+            # The grounded extension is in every complete extension, and nothing it
+            # attacks is in an admissible one
+            accepted = label == IN and not (skeptical and semantics == "admissible")
+        else:
+            if semantics == "stable":
+                af = self.framework()
+            else:
+                cone = self.upstream(name)
+                af = Framework(
+                    {c: self.descriptions[c] for c in cone},
+                    [(a, c) for c in cone for a in self.attackers[c]],
+                )
+            accepted = (is_skeptically_accepted if skeptical else is_credulously_accepted)(
+                af, name, semantics
+            )
+        self.accepted[key] = accepted
+        return accepted
@@ -0,0 +1,48 @@
+from math import sqrt
+from statistics import NormalDist
+
+# Adaptive Monte Carlo estimate of the proponent win rate: games are played in
+# batches until the confidence interval is within +-tolerance, or max_games is hit.
+# A deterministic outcome (the same game would be replayed every time) stops the run
+# after that game.
+
+
+# Wilson score interval of a binomial proportion, well behaved near 0 and 1
+def wilson_interval(wins, n, confidence=0.95):
+    if n == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = wins / n
+    denominator = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denominator
+    half_width = z * sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    low = 0.0 if wins == 0 else max(0.0, center - half_width)
+    high = 1.0 if wins == n else min(1.0, center + half_width)
+    return low, high
+
+
+# play_game(game_number) -> (winner, deterministic)
+def run_adaptive(play_game, batch_size=10, tolerance=0.05, confidence=0.95, max_games=1000):
+    games = 0
+    wins = 0
+    deterministic = False
+    while games < max_games and not deterministic:
+        for _ in range(min(batch_size, max_games - games)):
+            winner, deterministic = play_game(games)
+            games += 1
+            wins += winner == "Proponent"
+            if deterministic:
+                break
+        low, high = wilson_interval(wins, games, confidence)
+        if (high - low) / 2 <= tolerance:
+            break
+    if deterministic:
+        low = high = wins / games
+    return {
+        "games": games,
+        "wins": wins,
+        "win_rate": wins / games if games else None,
+        "interval": [low, high] if games else None,
+        "confidence": confidence,
+        "deterministic": deterministic,
+    }
@@ -0,0 +1,446 @@
+import os
+import re
+import argparse
+import json
+import mmap
+import struct
+import functools
+from array import array
+import instrument
+
+BINARY_MAGIC = b"AFBIN001"
+BINARY_HEADER = "<8sqq?7x"
+BINARY_EXTENSION = ".afb"
+
+
+# Compact argumentation framework shared by AF_semantics, game and graphs_af.
+# Arguments are mapped to dense ids 0..n-1. Attack relations are stored twice as
+# CSR arrays (attackers of each argument, targets of each argument) and as
+# Python int bitsets, so set operations become bitwise and/or. The bitsets take
+# O(n) bits per argument, so they are only built on first use.
+class Framework:
+    @instrument.timed("framework.build")
+    def __init__(self, arguments, attacks):
+        # arguments: dict name -> text (as in the JSON files) or an iterable of names
+        self.names = []
+        self.descriptions = []
+        self.index = {}
+        if isinstance(arguments, dict):
+            for name, description in arguments.items():
+                self.add_name(name, description)
+        else:
+            for name in arguments:
+                self.add_name(name)
+        sources = array("i")
+        targets = array("i")
+        for attacker, target in attacks:
+            sources.append(self.intern(attacker))
+            targets.append(self.intern(target))
+        self.set_attacks(sources, targets)
+
+    # Id of the name, added (described by itself) if it is new
+    def intern(self, name):
+        i = self.index.get(name)
+        if i is None:
+            i = self.index[name] = len(self.names)
+            self.names.append(name)
+            self.descriptions.append(name)
+        return i
+
+    def add_name(self, name, description=None):
+        i = self.intern(name)
+        if description is not None:
+            self.descriptions[i] = description
+
+    # Build the CSR arrays from the attacks as two parallel id arrays (duplicates allowed)
+    def set_attacks(self, sources, targets):
+        self.n = len(self.names)
+        self.target_offsets, self.target_ids = build_csr(self.n, sources, targets)
+        self.attacker_offsets, self.attacker_ids = build_csr(self.n, targets, sources)
+        self.n_attacks = len(self.target_ids)
+        self.init_views()
+
+    def init_views(self):
+        self._attacker_view = memoryview(self.attacker_ids)
+        self._target_view = memoryview(self.target_ids)
+        flags = bytearray((self.n + 7) // 8)
+        for i in range(self.n):
+            if i in self.targets(i):
+                flags[i >> 3] |= 1 << (i & 7)
+        self.self_attacking = int.from_bytes(flags, "little")
+
+    @functools.cached_property
+    def attackers_mask(self):
+        return [self.row_mask(self.attackers(i)) for i in range(self.n)]
+
+    @functools.cached_property
+    def targets_mask(self):
+        return [self.row_mask(self.targets(i)) for i in range(self.n)]
+
+    @staticmethod
+    def row_mask(ids):
+        mask = 0
+        for j in ids:
+            mask |= 1 << j
+        return mask
+
+    @classmethod
+    @instrument.timed("framework.load")
+    def from_json(cls, data_file):
+        # Streamed: arguments and attacks go straight into the id arrays, without
+        # holding the decoded JSON document
+        af = cls((), ())
+        sources = array("i")
+        targets = array("i")
+        with open(data_file, "r", encoding="utf-8") as f:
+            for key, value in iter_framework_json(f):
+                if key == "Arguments":
+                    af.add_name(*value)
+                elif key == "Attack Relations":
+                    attacker, target = value
+                    sources.append(af.intern(attacker))
+                    targets.append(af.intern(target))
+        af.set_attacks(sources, targets)
+        return af
+
+    # Binary format for repeat loads: the CSR arrays are memory-mapped, not copied
+    #   header      magic, n, number of attacks, whether descriptions are the names
+    #   arrays      target offsets (int64, n + 1), target ids (int32, m),
+    #               attacker offsets, attacker ids
+    #   strings     offsets (int64, n + 1) and utf-8 bytes of the names, then of the
+    #               descriptions unless they are the names
+    # Every section starts on an 8-byte boundary.
+    @classmethod
+    @instrument.timed("framework.load")
+    def from_binary(cls, data_file):
+        with open(data_file, "rb") as f:
+            buffer = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        magic, n, m, same = struct.unpack_from(BINARY_HEADER, buffer)
+        if magic != BINARY_MAGIC:
+            raise ValueError(f"{data_file} is not a binary framework file.")
+        position = struct.calcsize(BINARY_HEADER)
+
+        def section(fmt, length):
+            nonlocal position
+            view = buffer[position : position + length * array(fmt).itemsize].cast(fmt)
+            position = aligned(position + length * array(fmt).itemsize)
+            return view
+
+        def strings():
+            nonlocal position
+            offsets = section("q", n + 1)
+            data = buffer[position : position + offsets[n]]
+            position = aligned(position + offsets[n])
+            text = str(data, "utf-8")
+            if len(text) == offsets[n]:  # ASCII, offsets are the same in characters
+                return [text[offsets[i] : offsets[i + 1]] for i in range(n)]
+            return [str(data[offsets[i] : offsets[i + 1]], "utf-8") for i in range(n)]
+
+        af = cls.__new__(cls)
+        af.n = n
+        af.n_attacks = m
+        af.target_offsets = section("q", n + 1)
+        af.target_ids = section("i", m)
+        af.attacker_offsets = section("q", n + 1)
+        af.attacker_ids = section("i", m)
+        af.names = strings()
+        af.descriptions = list(af.names) if same else strings()
+        af.index = {name: i for i, name in enumerate(af.names)}
+        af.init_views()
+        return af
+
+    def save_binary(self, data_file):
+        same = self.descriptions == self.names
+        with open(data_file, "wb") as f:
+            f.write(struct.pack(BINARY_HEADER, BINARY_MAGIC, self.n, self.n_attacks, same))
+            for fmt, values in (
+                ("q", self.target_offsets),
+                ("i", self.target_ids),
+                ("q", self.attacker_offsets),
+                ("i", self.attacker_ids),
+            ):
+                write_aligned(f, array(fmt, values).tobytes())
+            for strings in (self.names,) if same else (self.names, self.descriptions):
+                encoded = [s.encode("utf-8") for s in strings]
+                offsets = array("q", [0])
+                for data in encoded:
+                    offsets.append(offsets[-1] + len(data))
+                write_aligned(f, offsets.tobytes())
+                write_aligned(f, b"".join(encoded))
+
+    # Framework restricted to the given ids (attacks leaving the set are dropped),
+    # attacker rows in the framework's order
+    def subframework(self, ids):
+        ids = list(ids)
+        keep = set(ids)
+        return Framework(
+            {self.names[i]: self.descriptions[i] for i in ids},
+            [
+                (self.names[i], self.names[j])
+                for j in ids
+                for i in self.attackers(j)
+                if i in keep
+            ],
+        )
+
+    # Integer-level queries
+
+    def attackers(self, i):
+        return self._attacker_view[self.attacker_offsets[i] : self.attacker_offsets[i + 1]]
+
+    def targets(self, i):
+        return self._target_view[self.target_offsets[i] : self.target_offsets[i + 1]]
+
+    def is_self_attacking(self, i):
+        return bool(self.self_attacking >> i & 1)
+
+    # Bitset helpers
+
+    def mask(self, names):
+        mask = 0
+        for name in names:
+            mask |= 1 << self.index[name]
+        return mask
+
+    def to_names(self, mask):
+        return [self.names[i] for i in iter_bits(mask)]
+
+    # Union of the arguments attacked by the set
+    def attacked_by(self, mask):
+        result = 0
+        for i in iter_bits(mask):
+            result |= self.targets_mask[i]
+        return result
+
+    def is_conflict_free(self, mask):
+        return not self.attacked_by(mask) & mask
+
+    # True if every attacker of argument i is attacked by the set
+    def defends(self, mask, i, attacked=None):
+        if attacked is None:
+            attacked = self.attacked_by(mask)
+        return not self.attackers_mask[i] & ~attacked
+
+    def is_admissible(self, mask):
+        attacked = self.attacked_by(mask)
+        if attacked & mask:
+            return False
+        return all(self.defends(mask, i, attacked) for i in iter_bits(mask))
+
+    # Name-level queries used by the game
+
+    def attackers_of(self, name):
+        return [self.names[j] for j in self.attackers(self.index[name])]
+
+    def targets_of(self, name):
+        return [self.names[j] for j in self.targets(self.index[name])]
+
+    def attacks_itself(self, name):
+        return self.is_self_attacking(self.index[name])
+
+    def description(self, name):
+        return self.descriptions[self.index[name]]
+
+    def edges(self):
+        for i in range(self.n):
+            for j in self.targets(i):
+                yield self.names[i], self.names[j]
+
+
+# Group (row, column) pairs into offsets/ids arrays: a counting sort on the rows, then
+# every row deduplicated in place. Rows keep the order of the attacks in the file
+# (first occurrence), as networkx listed them: the game's options depend on it.
+def build_csr(n, rows, columns):
+    offsets = array("q", bytes(8 * (n + 1)))
+    for row in rows:
+        offsets[row + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+    fill = array("q", offsets)
+    ids = array("i", bytes(4 * len(rows)))
+    for row, column in zip(rows, columns):
+        ids[fill[row]] = column
+        fill[row] += 1
+    del fill
+    end = 0
+    for i in range(n):
+        row = list(dict.fromkeys(ids[offsets[i] : offsets[i + 1]]))
+        offsets[i] = end
+        ids[end : end + len(row)] = array("i", row)
+        end += len(row)
+    offsets[n] = end
+    del ids[end:]
+    return offsets, ids
+
+
+def aligned(position):
+    return (position + 7) & ~7
+
+
+def write_aligned(f, data):
+    f.write(data)
+    f.write(bytes(aligned(len(data)) - len(data)))
+
+
+# Incremental parser for the framework JSON files. Yields ("Arguments", (name, text))
+# for every argument and ("Attack Relations", [attacker, target]) for every attack,
+# reading the file in chunks; other top-level keys are parsed and skipped. Plain
+# string members and [attacker, target] pairs are matched whole by a regex, anything
+# else goes through the token parser.
+_STRING = r'"(?:[^"\\]|\\.)*"'
+_TOKEN = re.compile(r'\s*(?:(' + _STRING + r')|([{}\[\]:,])|([^\s{}\[\]:,"]+))')
+_MEMBER = re.compile(r'\s*,?\s*(' + _STRING + r')\s*:\s*(' + _STRING + r')(?=\s*[,}])')
+_PAIR = re.compile(r'\s*,?\s*\[\s*(' + _STRING + r')\s*,\s*(' + _STRING + r')\s*\]')
+
+
+def decode_string(literal):
+    return json.loads(literal) if "\\" in literal else literal[1:-1]
+
+
+class JsonStream:
+    def __init__(self, f, chunk_size=1 << 20):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+
+    def refill(self):
+        chunk = self.f.read(self.chunk_size)
+        self.buffer = self.buffer[self.position :] + chunk
+        self.position = 0
+        self.eof = not chunk
+
+    # Match the pattern at the current position. A failed match, or one reaching the
+    # end of the buffer, is retried with more of the file: until the end of the file
+    # with grow (tokens), otherwise once (the fast paths then fall back to tokens).
+    def match(self, pattern, grow=False):
+        while True:
+            match = pattern.match(self.buffer, self.position)
+            if (match is None or match.end() == len(self.buffer)) and not self.eof:
+                if grow or len(self.buffer) - self.position < self.chunk_size:
+                    self.refill()
+                    continue
+            if match is not None:
+                self.position = match.end()
+            return match
+
+    def token(self):
+        match = self.match(_TOKEN, grow=True)
+        if match is None:
+            rest = self.buffer[self.position :]
+            if rest.strip():
+                raise ValueError(f"Invalid JSON near: {rest[:40]!r}")
+            return "end", None
+        string, punctuation, literal = match.groups()
+        if string is not None:
+            return "string", decode_string(string)
+        if punctuation is not None:
+            return punctuation, None
+        return "literal", json.loads(literal)
+
+
+def parse_value(stream, token=None):
+    kind, value = token or stream.token()
+    if kind in ("string", "literal"):
+        return value
+    if kind == "[":
+        items = []
+        kind, value = stream.token()
+        while kind != "]":
+            if kind != ",":
+                items.append(parse_value(stream, (kind, value)))
+            kind, value = stream.token()
+        return items
+    if kind == "{":
+        items = {}
+        for key, item in parse_members(stream):
+            items[key] = parse_value(stream, item)
+        return items
+    raise ValueError(f"Unexpected '{kind}' in JSON.")
+
+
+# (key, first token of the value) for the members of an object whose "{" was read;
+# the value must be consumed before the next member is read
+def parse_members(stream):
+    kind, key = stream.token()
+    while kind != "}":
+        if kind == ",":
+            kind, key = stream.token()
+            continue
+        if kind != "string" or stream.token()[0] != ":":
+            raise ValueError("Invalid JSON object.")
+        yield key, stream.token()
+        kind, key = stream.token()
+
+
+def iter_framework_json(f):
+    stream = JsonStream(f)
+    if stream.token()[0] != "{":
+        raise ValueError("A framework file must hold a JSON object.")
+    for key, token in parse_members(stream):
+        if key == "Arguments" and token[0] == "{":
+            while True:
+                member = stream.match(_MEMBER)
+                if member is not None:
+                    yield key, (decode_string(member[1]), decode_string(member[2]))
+                    continue
+                kind, name = stream.token()
+                if kind == "}":
+                    break
+                if kind == ",":
+                    continue
+                if kind != "string" or stream.token()[0] != ":":
+                    raise ValueError("Invalid JSON object.")
+                yield key, (name, parse_value(stream))
+        elif key == "Attack Relations" and token[0] == "[":
+            while True:
+                pair = stream.match(_PAIR)
+                if pair is not None:
+                    yield key, [decode_string(pair[1]), decode_string(pair[2])]
+                    continue
+                kind, value = stream.token()
+                if kind == "]":
+                    break
+                if kind != ",":
+                    yield key, parse_value(stream, (kind, value))
+        else:
+            parse_value(stream, token)
+
+
+def iter_bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+_loaded = {}
+
+
+# Load a framework (JSON, or binary with the .afb extension) once per file; reloaded
+# only if the file changes on disk
+def load_framework(data_file):
+    key = os.path.abspath(data_file)
+    mtime = os.path.getmtime(key)
+    cached = _loaded.get(key)
+    if cached is None or cached[0] != mtime:
+        if data_file.endswith(BINARY_EXTENSION):
+            cached = (mtime, Framework.from_binary(data_file))
+        else:
+            cached = (mtime, Framework.from_json(data_file))
+        _loaded[key] = cached
+    return cached[1]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert a JSON framework file to the binary format."
+    )
+    parser.add_argument("data_file", type=str, help="The path to the JSON data file.")
+    parser.add_argument(
+        "output", type=str, help=f"The path of the binary file ({BINARY_EXTENSION})."
+    )
+    args = parser.parse_args()
+
+    Framework.from_json(args.data_file).save_binary(args.output)
@@ -2,8 +2,11 @@ import os
 import json
 import uuid
 import argparse
-import networkx as nx
-import matplotlib.pyplot as plt
+from framework import load_framework
+from game_state import GameState
+import instrument
+import strategy
+import disk_cache
 
 
 class Game:
@@ -17,12 +20,18 @@ class Game:
         save_res_dir=None,
         add_game_text=False,
         choose_opponent_move=None,
+        choose_proponent_move=None,
+        strategy_table=None,
+        headless=False,
     ):
         self.data_file = data_file
-        self.data = self.load_data(data_file)
+        self.af = load_framework(data_file)
         self.claimed_argument = claimed_argument
+        # Move logs by name; the position itself (membership, options, bitsets) is
+        # kept by self.state
         self.proponent_arguments = []
         self.opponent_arguments = []
+        self.state = GameState(self.af)
         self.verbose = verbose
         self.show_graph = show_graph
         self.save_graph_dir = save_graph_dir
@@ -32,82 +41,75 @@ class Game:
         self.step = 1
         self.winner = None
         self.choose_opponent_move = choose_opponent_move
-        self.G = self.initialize_graph()
+        self.proponent_strategy = choose_proponent_move
+        self.strategy_table = strategy_table
+        self.headless = headless
+        self.frames = []  # (proponent, opponent, game text) lengths at every step
         self.id = uuid.uuid4()
 
-    @staticmethod
-    def load_data(data_file):
-        with open(data_file, "r") as f:
-            return json.load(f)
-
-    def initialize_graph(self):
-        G = nx.DiGraph()
-        G.add_nodes_from(self.data["Arguments"].keys())
-        G.add_edges_from(self.data["Attack Relations"])
-        return G
-
     def draw_graph(self):
+        if self.headless:
+            # Only log the step, the images can be rendered later with render.render_game
+            self.frames.append(
+                (
+                    len(self.proponent_arguments),
+                    len(self.opponent_arguments),
+                    len(self.game_text),
+                )
+            )
+            self.step += 1
+            return
+
         if not self.show_graph and not self.save_graph_dir:
             return
 
-        plt.figure(figsize=(16, 10))
-        pos = nx.spring_layout(self.G, seed=10)
-        nx.draw_networkx_nodes(
-            self.G, pos, nodelist=self.proponent_arguments, node_color="blue"
-        )
-        nx.draw_networkx_nodes(
-            self.G, pos, nodelist=self.opponent_arguments, node_color="red"
-        )
-        nx.draw_networkx_edges(
-            self.G, pos, edge_color="black", arrowstyle="->", arrowsize=20
-        )
-        nx.draw_networkx_labels(self.G, pos, font_size=12)
-        # argument_text = {k: f"{v}" for k, v in self.data["Arguments"].items()}
-        # pos_higher = {k: (v[0], v[1] + 0.04) for k, v in pos.items()}
-        # nx.draw_networkx_labels(
-        #     self.G,
-        #     pos_higher,
-        #     labels=argument_text,
-        #     horizontalalignment="center",
-        #     font_size=8,
-        # )
-
-        if self.add_game_text:
-            plt.text(
-                0.5,
-                0.05,
-                self.game_text,
-                ha="center",
-                va="center",
-                transform=plt.gcf().transFigure,
-            )
+        # matplotlib and networkx are only imported once a game is drawn
+        import render
 
-        plt.subplots_adjust(left=0.1, right=0.9, top=0.9, bottom=0.15)
+        render.draw_state(
+            self.af,
+            self.proponent_arguments,
+            self.opponent_arguments,
+            self.game_text if self.add_game_text else None,
+        )
 
         if self.save_graph_dir:
             self.save_graph_to_file()
 
         if self.show_graph:
-            plt.show(block=False)
+            render.show()
         else:
-            plt.close()
+            render.close()
 
         self.step += 1
 
+    @instrument.timed("render.save")
     def save_graph_to_file(self):
-        data_file_name = os.path.splitext(os.path.basename(self.data_file))[0]
         if self.save_graph_dir:
-            directory = os.path.join(
-                self.save_graph_dir,
-                data_file_name,
-                f"{data_file_name}_claimed_{self.claimed_argument}_{self.id}",
-            )
-            os.makedirs(directory, exist_ok=True)
-            filename = os.path.join(
-                directory,
-                f"{data_file_name}_claimed_{self.claimed_argument}_step_{self.step}.png",
+            import render
+
+            render.save(
+                render.step_image_path(
+                    self.save_graph_dir,
+                    self.data_file,
+                    self.claimed_argument,
+                    self.id,
+                    self.step,
+                )
             )
-            plt.savefig(filename)
+
+    # Compact move log of a headless game, enough to render its steps afterwards
+    def record(self):
+        return {
+            "data_file": self.data_file,
+            "claimed_argument": self.claimed_argument,
+            "id": str(self.id),
+            "proponent_arguments": list(self.proponent_arguments),
+            "opponent_arguments": list(self.opponent_arguments),
+            "game_text": self.game_text,
+            "frames": list(self.frames),
+            "winner": self.winner,
+        }
 
     def save_results(self):
         results = {
@@ -128,106 +130,84 @@ class Game:
                 directory,
                 f"{data_file_name}_claimed_{self.claimed_argument}_{self.id}_results.json",
             )
-            with open(filename, "w") as f:
+            with instrument.timer("results.game_file"), open(filename, "w") as f:
                 json.dump(results, f)
 
-    def choose_proponent_move(self, options):
-        best_argument = None
-        best_path_length = float("inf")
-
-        def dfs(argument, path, visited_proponent, visited_opponent):
-            nonlocal best_argument, best_path_length
-
-            # Losing conditions
-            if argument in visited_opponent or argument in self.G.predecessors(
-                argument
-            ):
-                return False
-
-            # Find best path
-            if all(pred in visited_proponent for pred in self.G.predecessors(argument)):
-                if len(path) < best_path_length:
-                    best_argument = path[0]
-                    best_path_length = len(path)
-                return True
-
-            for next_argument in self.G.predecessors(argument):
-                if next_argument not in visited_proponent:
-                    visited_proponent.add(next_argument)
-                    path.append(next_argument)
-                    if dfs(next_argument, path, visited_proponent, visited_opponent):
-                        return True
-                    path.pop()
-                    visited_proponent.remove(next_argument)
+    @property
+    def proponent_mask(self):
+        return self.state.proponent_mask
 
-            return False
-
-        for argument in options:
-            dfs(argument, [argument], {argument}, set(self.opponent_arguments))
+    @property
+    def opponent_mask(self):
+        return self.state.opponent_mask
 
-        return (
-            best_argument if best_argument else options[0]
-        )  # Fallback to the first option if no winning path is found
+    def choose_proponent_move(self, options):
+        if self.strategy_table:
+            return self.strategy_table.best_move(self.state)
+        return strategy.choose_proponent_move(
+            self.af, options, self.opponent_mask, claim=self.claimed_argument
+        )
 
     def proponent_turn(self):
         options = (
-            [node for node in self.G.predecessors(self.opponent_arguments[-1])]
+            [self.af.names[i] for i in self.state.proponent_options()]
             if self.opponent_arguments
             else [self.claimed_argument]
         )
-        if not options or options[0] in self.opponent_arguments:
+        if not options:
             print("Proponent cannot make a move. Opponent wins!")
             self.winner = "Opponent"
             return False
         if len(options) == 1:
             argument = options[0]
         else:
-            argument = self.choose_proponent_move(options)
+            argument = (
+                self.proponent_strategy(self, options)
+                if self.proponent_strategy
+                else self.choose_proponent_move(options)
+            )
 
+        self.state.play_proponent(self.af.index[argument])
         self.proponent_arguments.append(argument)
-        print(f"Proponent's argument: {self.data['Arguments'][argument]}")
+        print(f"Proponent's argument: {self.af.description(argument)}")
         if self.verbose:
-            print("Game state:", self.__dict__)
+            print(self.describe_state())
         return True
 
     def opponent_turn(self):
-        options = [
-            attack
-            for argument in set(self.proponent_arguments)
-            for attack in self.G.predecessors(argument)
-            if attack not in self.opponent_arguments
-        ]
-        if not options:
+        if not self.state.opponent_can_move():
             print("Opponent has no choices left. Proponent wins!")
             self.winner = "Proponent"
-            self.game_text += f"Step({self.step}) Proponent: {self.data['Arguments'][self.proponent_arguments[-1]]}\n"
+            self.game_text += f"Step({self.step}) Proponent: {self.af.description(self.proponent_arguments[-1])}\n"
             self.draw_graph()
             return False
 
+        options = [self.af.names[i] for i in self.state.opponent_options()]
         argument = (
             self.choose_opponent_move(self, options)
             if self.choose_opponent_move
             else self.get_user_choice(options)
         )
-        if argument in self.proponent_arguments:
+        if self.state.is_proponent(self.af.index[argument]):
             print(
                 "The opponent used an argument previously used by the proponent (contradiction). Opponent wins!"
             )
             self.winner = "Opponent"
-            self.game_text += f"Step({self.step}) Opponent: {self.data['Arguments'][self.opponent_arguments[-1]]}\n"
+            self.game_text += f"Step({self.step}) Opponent: {self.af.description(argument)}\n"
             self.draw_graph()
             return False
 
+        self.state.play_opponent(self.af.index[argument])
         self.opponent_arguments.append(argument)
-        print(f"Opponent's argument: {self.data['Arguments'][argument]}")
+        print(f"Opponent's argument: {self.af.description(argument)}")
         if self.verbose:
-            print("Game state:", self.__dict__)
+            print(self.describe_state())
         return True
 
     def get_user_choice(self, options):
         print("Opponent's options:")
         for i, option in enumerate(options):
-            print(f"{i+1}. {self.data['Arguments'][option]}")
+            print(f"{i+1}. {self.af.description(option)}")
         while True:
             try:
                 choice = int(input("Enter the number of your choice: ")) - 1
@@ -239,18 +219,33 @@ class Game:
                 "Invalid input. Please enter a number corresponding to one of the options."
             )
 
+    # Why the claim holds or falls, from the dispute tree of the claimed argument
+    def explain(self):
+        from graphs_af import dispute_tree
+
+        tree = dispute_tree(self.af, self.claimed_argument)
+        return "\n".join(tree.explain())
+
+    # One line instead of the whole __dict__, which gets slow to print on big games
+    def describe_state(self):
+        return (
+            f"Game state: step {self.step}, proponent {self.proponent_arguments}, "
+            f"opponent {self.opponent_arguments}"
+        )
+
+    @instrument.timed("game.play")
     def play(self):
         while True:
             print("\nProponent's turn...")
             if not self.proponent_turn():
                 break
-            self.game_text += f"Step({self.step}) Proponent: {self.data['Arguments'][self.proponent_arguments[-1]]}\n"
+            self.game_text += f"Step({self.step}) Proponent: {self.af.description(self.proponent_arguments[-1])}\n"
             self.draw_graph()
 
             print("\nOpponent's turn...")
             if not self.opponent_turn():
                 break
-            self.game_text += f"Step({self.step}) Opponent: {self.data['Arguments'][self.opponent_arguments[-1]]}\n"
+            self.game_text += f"Step({self.step}) Opponent: {self.af.description(self.opponent_arguments[-1])}\n"
             self.draw_graph()
 
         self.save_results()
@@ -285,15 +280,47 @@ if __name__ == "__main__":
         action="store_true",
         help="If set, add game text to the graph.",
     )
+    parser.add_argument(
+        "--strategy_table",
+        action="store_true",
+        help="If set, solve the game exactly first and play the proponent's best moves.",
+    )
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="If set, print the dispute tree explanation of the claim after the game.",
+    )
+    instrument.add_arguments(parser)
+    disk_cache.add_arguments(parser)
     args = parser.parse_args()
+    disk_cache.configure(args)
 
-    game = Game(
-        args.data_file,
-        args.claimed_argument,
-        args.verbose,
-        args.show_graph,
-        args.save_graph,
-        args.save_res,
-        args.add_game_text,
-    )
-    game.play()
+    with instrument.session(args):
+        table = None
+        if args.strategy_table:
+            af = load_framework(args.data_file)
+            try:
+                probability, forced = disk_cache.claim_values(af, args.claimed_argument)[
+                    args.claimed_argument
+                ]
+                table = strategy.strategy_table(af)
+                print(
+                    f"Proponent {'has' if forced else 'does not have'} a winning strategy "
+                    f"(win probability against a random opponent: {probability:.3f})."
+                )
+            except strategy.TableTooLarge as e:
+                print(f"{e} The proponent plays the DFS strategy instead.")
+
+        game = Game(
+            args.data_file,
+            args.claimed_argument,
+            args.verbose,
+            args.show_graph,
+            args.save_graph,
+            args.save_res,
+            args.add_game_text,
+            strategy_table=table,
+        )
+        game.play()
+        if args.explain:
+            print(game.explain())
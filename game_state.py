@@ -0,0 +1,124 @@
+PROPONENT = "Proponent"
+OPPONENT = "Opponent"
+
+
+# Position of a discussion game on a framework.Framework, updated move by move.
+# Argument ids are used throughout; membership of either side is an O(1) lookup and
+# the opponent's options (the attackers of the proponent arguments it has not used
+# yet) are kept as a frontier extended when the proponent plays a new argument, so
+# a move costs O(attackers of the argument) instead of a rescan of both move lists.
+# Every move can be undone, so the strategy searches walk the game tree on one state
+# (apply a move, search below it, undo it) instead of copying positions.
+class GameState:
+    def __init__(self, af):
+        self.af = af
+        self.proponent = []  # ids in the order played (the proponent may repeat)
+        self.opponent = []
+        self.proponent_uses = {}  # id -> times played
+        self.opponent_used = set()
+        self.proponent_mask = 0  # bitsets of both sides, for the strategy table
+        self.opponent_mask = 0
+        # One entry per (new proponent argument, attacker), in the order the
+        # options were always listed; entries of used attackers are skipped
+        self.frontier = []
+        self.live = 0  # entries whose attacker the opponent has not used
+        self.history = []  # (side, id, frontier entries added, change of live), for undo
+        self._options = None
+
+    # Proponent's options: the claim on the first move, then the attackers of the
+    # opponent's last argument. Empty when it cannot move (nothing to answer with, or
+    # the first option was already used by the opponent, as Game.proponent_turn has it).
+    def proponent_options(self, claim=None):
+        if not self.opponent:
+            return [] if claim is None else [claim]
+        options = self.af.attackers(self.opponent[-1])
+        if not options or options[0] in self.opponent_used:
+            return []
+        return list(options)
+
+    # Opponent's options, duplicates included; cached until the next move
+    def opponent_options(self):
+        if self._options is None:
+            used = self.opponent_used
+            self._options = [a for a in self.frontier if a not in used]
+        return self._options
+
+    def opponent_can_move(self):
+        return self.live > 0
+
+    def is_proponent(self, i):
+        return i in self.proponent_uses
+
+    def is_opponent(self, i):
+        return i in self.opponent_used
+
+    def play_proponent(self, i):
+        self.proponent.append(i)
+        proponent_uses = self.proponent_uses
+        uses = proponent_uses.get(i, 0)
+        proponent_uses[i] = uses + 1
+        added = live = 0
+        if not uses:
+            self.proponent_mask |= 1 << i
+            attackers = self.af.attackers(i)
+            added = len(attackers)
+            if added:
+                self.frontier.extend(attackers)
+                live = added - len(self.opponent_used.intersection(attackers))
+                self.live += live
+        self.history.append((PROPONENT, i, added, live))
+        self._options = None
+
+    def play_opponent(self, i):
+        if i in self.opponent_used:
+            raise ValueError(f"The opponent already used '{self.af.names[i]}'.")
+        self.opponent.append(i)
+        self.opponent_used.add(i)
+        self.opponent_mask |= 1 << i
+        # i leaves the frontier once per proponent argument it attacks
+        proponent_uses = self.proponent_uses
+        live = -sum(1 for t in self.af.targets(i) if t in proponent_uses)
+        self.live += live
+        self.history.append((OPPONENT, i, 0, live))
+        self._options = None
+
+    def apply(self, side, i):
+        if side == PROPONENT:
+            self.play_proponent(i)
+        else:
+            self.play_opponent(i)
+
+    # Take back the last move, returns (side, id)
+    def undo(self):
+        side, i, added, live = self.history.pop()
+        self.live -= live
+        if side == PROPONENT:
+            self.proponent.pop()
+            uses = self.proponent_uses.pop(i) - 1
+            if uses:
+                self.proponent_uses[i] = uses
+            else:
+                self.proponent_mask &= ~(1 << i)
+            if added:
+                del self.frontier[-added:]
+        else:
+            self.opponent.pop()
+            self.opponent_used.discard(i)
+            self.opponent_mask &= ~(1 << i)
+        self._options = None
+        return side, i
+
+    # Strategy table key of the proponent's turn: (proponent, opponent, last argument)
+    def key(self):
+        return self.proponent_mask, self.opponent_mask, self.opponent[-1]
+
+    # State after the moves of a game record (lists of names, alternating from the
+    # proponent), e.g. to replay or analyse a saved game
+    @classmethod
+    def from_moves(cls, af, proponent_arguments, opponent_arguments):
+        state = cls(af)
+        for n, name in enumerate(proponent_arguments):
+            state.apply(PROPONENT, af.index[name])
+            if n < len(opponent_arguments):
+                state.apply(OPPONENT, af.index[opponent_arguments[n]])
+        return state
@@ -0,0 +1,88 @@
+import json
+import random
+import argparse
+
+# Seeded random argumentation frameworks, in the same layout as the JSON files in
+# Argumentation_Framework_tests ({"Arguments": {...}, "Attack Relations": [...]}).
+
+
+def framework_data(n, attacks):
+    names = [str(i) for i in range(n)]
+    return {
+        "Arguments": {name: name for name in names},
+        "Attack Relations": sorted([names[a], names[b]] for a, b in attacks),
+    }
+
+
+# Every ordered pair (self-attacks included) is an attack with probability density
+def erdos_renyi(n, density=0.05, seed=None):
+    rng = random.Random(seed)
+    attacks = {(a, b) for a in range(n) for b in range(n) if rng.random() < density}
+    return framework_data(n, attacks)
+
+
+# Arguments on a square-ish grid attacking their right and lower neighbours. Each
+# grid edge is kept with probability density, pointing either way (or both ways
+# with probability density / 2), which gives long chains and many even/odd cycles.
+def grid(n, density=0.8, seed=None):
+    rng = random.Random(seed)
+    cols = max(1, int(n**0.5))
+    attacks = set()
+    for a in range(n):
+        for b in (a + 1 if (a + 1) % cols else None, a + cols):
+            if b is None or b >= n or rng.random() >= density:
+                continue
+            attacks.add((a, b) if rng.random() < 0.5 else (b, a))
+            if rng.random() < density / 2:
+                attacks.add((b, a))
+    return framework_data(n, attacks)
+
+
+# Preferential attachment: every new argument gets `edges` attacks with arguments
+# picked proportionally to their degree, in a random direction. density sets the
+# number of edges per argument as density * n (at least 1).
+def scale_free(n, density=0.02, seed=None):
+    rng = random.Random(seed)
+    edges = max(1, int(density * n))
+    attacks = set()
+    endpoints = []
+    for a in range(n):
+        targets = set()
+        for _ in range(min(edges, a)):
+            targets.add(rng.choice(endpoints) if endpoints else rng.randrange(a))
+        for b in targets:
+            attacks.add((a, b) if rng.random() < 0.5 else (b, a))
+            endpoints.extend((a, b))
+    return framework_data(n, attacks)
+
+
+SHAPES = {
+    "erdos_renyi": erdos_renyi,
+    "grid": grid,
+    "scale_free": scale_free,
+}
+
+
+def generate(shape, n, density=None, seed=None):
+    if shape not in SHAPES:
+        raise ValueError(f"Unknown framework shape '{shape}'.")
+    if density is None:
+        return SHAPES[shape](n, seed=seed)
+    return SHAPES[shape](n, density, seed)
+
+
+def save(data, path):
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a random argumentation framework.")
+    parser.add_argument("shape", choices=sorted(SHAPES), help="Shape of the attack graph.")
+    parser.add_argument("n", type=int, help="Number of arguments.")
+    parser.add_argument("output", type=str, help="The path of the JSON file to write.")
+    parser.add_argument("--density", type=float, help="Shape-specific attack density.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+    args = parser.parse_args()
+
+    save(generate(args.shape, args.n, args.density, args.seed), args.output)
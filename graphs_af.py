@@ -1,112 +1,188 @@
-import os
 import json
-import networkx as nx
-
-# DEFENDERS
-# no loop to itself
-# all attackers ( paernets ) need to have a defender ( grandparent ) to counter, or so on and so on...
-# In order to be conflict free the defender canot be attacked by the argument itself.
-# 
-
-
-class ArgumentationFramework:
-    def __init__(self, data_file, argument):
-        self.CFS = {}
+import argparse
+from collections import deque
+from framework import load_framework
+from scc import decomposition
+from semantics import is_credulously_accepted
+
+PROPONENT = "Proponent"
+OPPONENT = "Opponent"
+
+
+# Dispute tree of a claimed argument: the claim at the root, its attackers (the
+# opponent's moves) below it, their attackers (the proponent's possible defences)
+# below those, and so on. Nodes are (argument id, side) pairs, expanded once each,
+# breadth-first, and shared by every branch reaching them, so the tree is stored as
+# a DAG over the upstream cone of the claim: building, solving and printing it is
+# linear in the arguments and attacks of the cone. An edge between arguments of the
+# same SCC closes a cycle (the tree would be infinite if unfolded).
+#
+# Nodes are solved like the grounded labelling: a node is won by its own side when
+# every child is (an unattacked claim stands, an attacker without defence stands),
+# and by the other side as soon as one child is. round is the number of levels the
+# winner needs below the node; nodes left on undecided cycles have no winner.
+class DisputeTree:
+    def __init__(self, af, argument):
+        if argument not in af.index:
+            raise ValueError(f"The argument '{argument}' does not appear in the AF.")
+        self.af = af
         self.argument = argument
-        self.data = self.load_data(data_file)
-
-        # Initialize the graph
-        self.G = nx.DiGraph()
-        self.G.add_nodes_from(self.data["Arguments"].keys())
-        self.G.add_edges_from(self.data["Attack Relations"])
-
-        # Get attackers of the argument.
-        self.attackers = list(self.G.predecessors(self.argument))
-        print('Attackers: ', self.attackers)
-        self.compute_defenders()
-        print('Defenders: ', self.CFS)
-        self.check_defenders()
-
-    def compute_defenders(self):
-        for attacker in self.attackers:
-            defenders = list(self.G.predecessors(attacker))
-            if len(defenders) == 0:
-                print(f"'{self.argument}' is not credulously acceptable under the respective semantics")
-                return False
-            else:
-                self.CFS[attacker] = defenders
-
-    def check_defenders(self):
-        for attacker, defenders in self.CFS.items():
-            for defender in defenders:
-                parents = list(self.G.predecessors(defender))
-                if len(parents) == 0:
-                    del self.CFS[attacker]
-                    break
-                if self.G.has_edge(defender, defender):
+        self.root = (af.index[argument], PROPONENT)
+        self.depth = {self.root: 0}
+        self.tree_parent = {self.root: None}  # the node each node is expanded under
+        self.children = {}
+        self.parents = {}
+        self.winner = {}
+        self.round = {}
+        self.expand()
+        self.solve()
+
+    def expand(self):
+        queue = deque([self.root])
+        while queue:
+            node = queue.popleft()
+            i, side = node
+            other = OPPONENT if side == PROPONENT else PROPONENT
+            children = [(attacker, other) for attacker in self.af.attackers(i)]
+            self.children[node] = children
+            for child in children:
+                self.parents.setdefault(child, []).append(node)
+                if child not in self.depth:
+                    self.depth[child] = self.depth[node] + 1
+                    self.tree_parent[child] = node
+                    queue.append(child)
+
+    def solve(self):
+        # Children not yet won by the side of the node
+        remaining = {node: len(children) for node, children in self.children.items()}
+        queue = deque()
+        for node, count in remaining.items():
+            if count == 0:
+                self.winner[node] = node[1]
+                self.round[node] = 0
+                queue.append(node)
+        # Rounds only grow along the queue, so the first answer found is the quickest
+        while queue:
+            child = queue.popleft()
+            winner = self.winner[child]
+            for parent in self.parents.get(child, ()):
+                if parent in self.winner:
                     continue
+                if winner == parent[1]:
+                    remaining[parent] -= 1
+                    if remaining[parent]:
+                        continue
+                self.winner[parent] = winner
+                self.round[parent] = self.round[child] + 1
+                queue.append(parent)
+
+    # PROPONENT, OPPONENT or None (undecided) for the claim
+    def result(self):
+        return self.winner.get(self.root)
+
+    def node_dict(self, node):
+        return {
+            "argument": self.af.names[node[0]],
+            "side": node[1],
+            "winner": self.winner.get(node),
+        }
+
+    # Nested dicts, JSON ready. A node is expanded under the parent that reached it
+    # first; its other occurrences are references ("ref": true), flagged "cycle" when
+    # they close a cycle.
+    def to_dict(self):
+        component_of = decomposition(self.af).component_of
+        dicts = {node: self.node_dict(node) for node in self.children}
+        for node, children in self.children.items():
+            expanded = dicts[node]["children"] = []
+            for child in children:
+                if self.tree_parent[child] == node and "children" not in dicts[child]:
+                    expanded.append(dicts[child])
                 else:
-                    self.find_and_add_defenders(parents)
-            if len(self.CFS) == 0:
-                print(f"'{self.argument}' is credulously acceptable under the respective semantics in a given AF")
-                return True
-
-    def find_and_add_defenders(self, attackers):
-        for attacker in attackers:
-            defenders = list(self.G.predecessors(attacker))
-            self.CFS[attacker] = defenders
-
-
-    # Load the data from the file
-    def load_data(self, data_file):
-        with open(data_file, "r") as f:
-            data = json.load(f)
-        return data
-
-    def has_grandparent(self):
-        # Check if the graph contains the node
-        if self.argument not in self.G:
-            print("this argument does not apper in the AF.")
-            return False
-
-        parents = self.G.predecessors(self.argument)
-        # If argument has no parents, then it's acceptable
-        if not parents:
-            print(
-                f"'{self.argument}' is credulously acceptable under the respective semantics in a given AF"
-            )
-            return True
-        # If argument is it's own parent, then it's not acceptable
-        if self.argument in parents:
+                    reference = self.node_dict(child)
+                    reference["ref"] = True
+                    reference["cycle"] = component_of[node[0]] == component_of[child[0]]
+                    expanded.append(reference)
+        return dicts[self.root]
+
+    # The winner's strategy as indented lines: every answer of the side that holds
+    # a node, and the quickest winning move against a side that loses it
+    def explain(self):
+        lines = []
+        seen = set()
+        stack = [(self.root, 0)]
+        while stack:
+            node, level = stack.pop()
+            name = self.af.names[node[0]]
+            indent = "  " * level
+            if node in seen:
+                lines.append(f"{indent}{name} ({node[1]}): see above")
+                continue
+            seen.add(node)
+            winner = self.winner.get(node)
+            children = self.children[node]
+            if winner is None:
+                reason = "undecided, on a cycle"
+                shown = []
+            elif not children:
+                reason = "unattacked" if node[1] == PROPONENT else "no defence"
+                shown = []
+            elif winner == node[1]:
+                reason = (
+                    "every attacker is answered"
+                    if node[1] == PROPONENT
+                    else "every defence fails"
+                )
+                shown = children
+            else:
+                reason = "attacked by" if node[1] == PROPONENT else "answered by"
+                shown = [
+                    min(
+                        (child for child in children if self.winner.get(child) == winner),
+                        key=self.round.__getitem__,
+                    )
+                ]
+            lines.append(f"{indent}{name} ({node[1]}): {reason}")
+            stack.extend((child, level + 1) for child in reversed(shown))
+        return lines
+
+
+# One tree per (framework, argument), reused by the game and the explanations
+def dispute_tree(af, argument):
+    trees = getattr(af, "_dispute_trees", None)
+    if trees is None:
+        trees = af._dispute_trees = {}
+    tree = trees.get(argument)
+    if tree is None:
+        tree = trees[argument] = DisputeTree(af, argument)
+    return tree
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the dispute tree of an argument.")
+    parser.add_argument("data_file", type=str, help="The path to the data file.")
+    parser.add_argument("argument", type=str, help="The claimed argument.")
+    parser.add_argument(
+        "--json", action="store_true", help="If set, print the whole tree as JSON."
+    )
+    args = parser.parse_args()
+
+    af = load_framework(args.data_file)
+    try:
+        tree = dispute_tree(af, args.argument)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.json:
+        print(json.dumps(tree.to_dict(), indent=2))
+    else:
+        print("\n".join(tree.explain()))
+        winner = tree.result()
+        if winner is None:
+            # Cycles the grounded dispute cannot settle: fall back on the labelling
+            accepted = is_credulously_accepted(af, args.argument)
             print(
-                f"'{self.argument}' is not credulously acceptable under the respective semantics"
+                f"'{args.argument}' is {'' if accepted else 'not '}credulously acceptable "
+                "under admissible semantics (the dispute is undecided)"
             )
-            return False
-
-        # Iterate over the parents of the node
-        for parent in parents:
-            # Check if any parent has its own parent
-            if len(list(self.G.predecessors(parent))) == 0:
-                print(
-                    f"'{self.argument}' is not credulously acceptable under the respective semantics in a given AF"
-                )
-                return False
-
-        print(
-            f"'{self.argument}' is credulously acceptable under the respective semantics in a given AF"
-        )
-        return True
-
-    def is_conflict_free(self, args_set):
-        for arg in args_set:
-            for attacked in self.attack_relations.get(arg, []):
-                if attacked in args_set:
-                    return False
-        return True
-
-
-# Define the full file path
-path = os.path.join(os.getcwd(), "Argumentation_Framework_tests/AF_test_1.json")
-argument = "B"
-
-af = ArgumentationFramework(path, argument)
+        else:
+            print(f"{winner} wins the dispute on '{args.argument}'")
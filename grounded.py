@@ -0,0 +1,41 @@
+from collections import deque
+from labelling import IN, OUT, UNDEC
+
+
+# Grounded labelling as the least fixpoint of the characteristic function, in O(|A| + |R|).
+# Works like unit propagation: an argument whose attackers are all OUT becomes IN,
+# and everything an IN argument attacks becomes OUT. What is left is UNDEC.
+def grounded_labelling(af):
+    labels = getattr(af, "_grounded", None)
+    if labels is not None:
+        return labels
+
+    labels = bytearray([UNDEC]) * af.n
+    remaining = [len(af.attackers(i)) for i in range(af.n)]  # attackers not yet OUT
+    queue = deque(i for i in range(af.n) if remaining[i] == 0)
+    for i in queue:
+        labels[i] = IN
+
+    while queue:
+        i = queue.popleft()
+        for target in af.targets(i):
+            if labels[target] != UNDEC:
+                continue
+            labels[target] = OUT
+            for j in af.targets(target):
+                remaining[j] -= 1
+                if remaining[j] == 0 and labels[j] == UNDEC:
+                    labels[j] = IN
+                    queue.append(j)
+
+    af._grounded = labels
+    return labels
+
+
+def grounded_extension(af):
+    return [i for i, label in enumerate(grounded_labelling(af)) if label == IN]
+
+
+# IN, OUT or UNDEC label of an argument name in the grounded labelling
+def grounded_label(af, argument):
+    return grounded_labelling(af)[af.index[argument]]
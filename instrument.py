@@ -0,0 +1,150 @@
+import json
+import time
+import functools
+import contextlib
+from collections import Counter
+
+# Opt-in counters and timers for the hot paths. Call sites check `instrument.enabled`
+# before counting, and timer() hands back a shared no-op context when it is off, so a
+# disabled run only pays for an attribute lookup. Nested timers also record their
+# self time per call stack, which write_folded exports for flamegraph.pl/speedscope.
+
+enabled = False
+counters = Counter()
+timers = {}  # name -> [calls, total seconds]
+stacks = Counter()  # "outer;inner" -> self seconds
+_active = []
+_NULL = contextlib.nullcontext()
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    counters.clear()
+    timers.clear()
+    stacks.clear()
+    del _active[:]
+
+
+def count(name, n=1):
+    if enabled:
+        counters[name] += n
+
+
+class Timer:
+    __slots__ = ("name", "start", "children")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.children = 0.0
+        _active.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stacks[";".join(timer.name for timer in _active)] += elapsed - self.children
+        _active.pop()
+        if _active:
+            _active[-1].children += elapsed
+        entry = timers.setdefault(self.name, [0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+
+
+def timer(name):
+    return Timer(name) if enabled else _NULL
+
+
+# Decorator version of timer() for whole functions
+def timed(name):
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            with Timer(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def summary():
+    return {
+        "counters": dict(sorted(counters.items())),
+        "timers": {
+            name: {"calls": calls, "seconds": seconds}
+            for name, (calls, seconds) in sorted(timers.items())
+        },
+    }
+
+
+# JSON summary of the run, "-" for stdout
+def write_summary(path):
+    if path == "-":
+        print(json.dumps(summary(), indent=2))
+        return
+    with open(path, "w") as f:
+        json.dump(summary(), f, indent=2)
+
+
+# Folded stacks ("outer;inner microseconds" per line), the flamegraph.pl input format
+def write_folded(path):
+    with open(path, "w") as f:
+        for stack, seconds in sorted(stacks.items()):
+            f.write(f"{stack} {round(seconds * 1e6)}\n")
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        "--stats",
+        type=str,
+        help="Record counters and timers and write them to this JSON file ('-' for stdout).",
+    )
+    parser.add_argument(
+        "--flamegraph",
+        type=str,
+        help="Write the timers as folded stacks (flamegraph.pl format) to this file.",
+    )
+    parser.add_argument(
+        "--profile", type=str, help="Run under cProfile and write the stats to this file."
+    )
+
+
+# Instrument the body according to the add_arguments options
+@contextlib.contextmanager
+def session(args):
+    instrumented = bool(args.stats or args.flamegraph)
+    if instrumented:
+        reset()
+        enable()
+    profiler = None
+    if args.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+        if instrumented:
+            disable()
+            if args.stats:
+                write_summary(args.stats)
+            if args.flamegraph:
+                write_folded(args.flamegraph)
@@ -0,0 +1,171 @@
+import argparse
+from collections import deque
+from framework import load_framework
+from grounded import grounded_labelling
+from labelling import IN, OUT, UNDEC
+
+# Kernelization: a smaller framework with the same acceptance answers. Each step
+# preserves credulous and skeptical acceptance of every argument it keeps (for the
+# semantics of semantics.SEMANTICS), and the arguments it drops get their answer
+# from the step that dropped them:
+#   1. grounded IN and OUT arguments are decided: every complete (and stable)
+#      extension is the grounded extension plus an extension of the UNDEC part, so
+#      only the UNDEC arguments are kept (none of them is attacked by an IN one)
+#   2. UNDEC self-attackers attacking nothing else are never in a conflict-free set
+#      and never threaten one: rejected (not for stable semantics, where they still
+#      have to be attacked by the extension)
+#   3. with queries, only what reaches a queried argument is kept (directionality,
+#      not for stable semantics)
+#   4. arguments with the same attackers and the same targets (twins) are in the
+#      same extensions, so one represents them all. Repeated until no twins are left,
+#      since dropping twins can make new ones.
+# Steps 1-2 keep every kernel argument attacked, so the grounded extension of the
+# kernel is empty and its searches start from scratch on a smaller graph.
+# The discussion game does not run on the kernel: the decided arguments, rejected
+# self-attackers and merged twins it drops are legal moves of the game, so its
+# positions and outcomes would change. The game searches the claim's upstream cone
+# instead (strategy.choose_proponent_move), which keeps every move.
+class Kernel:
+    def __init__(self, af, semantics="admissible", queries=None):
+        self.original = af
+        self.semantics = semantics
+        # Original name -> IN or OUT for the decided (or rejected) arguments
+        self.status = {}
+        labels = grounded_labelling(af)
+        keep = bytearray(af.n)
+        for i, label in enumerate(labels):
+            if label == UNDEC:
+                keep[i] = 1
+            else:
+                self.status[af.names[i]] = label
+
+        if semantics != "stable":
+            self.reject_self_attackers(keep)
+            if queries is not None:
+                self.restrict_to_cone(keep, queries)
+
+        members = self.collapse_twins(keep)
+        kept = [i for i in range(af.n) if keep[i]]
+        self.af = af.subframework(kept)
+        # Kernel name -> original names it stands for, and the way back
+        self.members = {af.names[i]: [af.names[j] for j in members[i]] for i in kept}
+        self.representative = {
+            name: representative
+            for representative, names in self.members.items()
+            for name in names
+        }
+
+    def reject_self_attackers(self, keep):
+        af = self.original
+        queue = deque(i for i in range(af.n) if keep[i] and af.is_self_attacking(i))
+        while queue:
+            i = queue.popleft()
+            if not keep[i] or any(keep[t] and t != i for t in af.targets(i)):
+                continue
+            keep[i] = 0
+            self.status[af.names[i]] = OUT
+            # An attacker may now only attack itself too
+            queue.extend(a for a in af.attackers(i) if keep[a] and af.is_self_attacking(a))
+
+    def restrict_to_cone(self, keep, queries):
+        af = self.original
+        reached = bytearray(af.n)
+        queue = deque()
+        for name in queries:
+            if name not in af.index:
+                raise ValueError(f"The argument '{name}' does not appear in the AF.")
+            i = af.index[name]
+            if keep[i] and not reached[i]:
+                reached[i] = 1
+                queue.append(i)
+        while queue:
+            for attacker in af.attackers(queue.popleft()):
+                if keep[attacker] and not reached[attacker]:
+                    reached[attacker] = 1
+                    queue.append(attacker)
+        keep[:] = reached
+
+    # Drops the twins from keep, returns {kept id: ids it represents}
+    def collapse_twins(self, keep):
+        af = self.original
+        members = {i: [i] for i in range(af.n) if keep[i]}
+        changed = True
+        while changed:
+            changed = False
+            representatives = {}
+            for i in range(af.n):
+                if not keep[i]:
+                    continue
+                signature = (
+                    tuple(sorted(a for a in af.attackers(i) if keep[a])),
+                    tuple(sorted(t for t in af.targets(i) if keep[t])),
+                )
+                representative = representatives.setdefault(signature, i)
+                if representative != i:
+                    keep[i] = 0
+                    members[representative].extend(members.pop(i))
+                    changed = True
+        return members
+
+    # Kernel name standing for an original argument, None if it was decided
+    def argument(self, name):
+        if name in self.status:
+            return None
+        if name not in self.representative:
+            raise ValueError(f"The argument '{name}' is not in the kernel's queries.")
+        return self.representative[name]
+
+    # Original names of a set of kernel arguments, twins included
+    def expand(self, names):
+        return [member for name in names for member in self.members[name]]
+
+
+def kernelize(af, semantics="admissible", queries=None):
+    return Kernel(af, semantics, queries)
+
+
+# Kernel of the whole framework, cached: stable semantics has its own (no step 2),
+# every other semantics shares one
+def framework_kernel(af, semantics="admissible"):
+    kernels = getattr(af, "_kernels", None)
+    if kernels is None:
+        kernels = af._kernels = {}
+    stable = semantics == "stable"
+    kernel = kernels.get(stable)
+    if kernel is None:
+        kernel = kernels[stable] = Kernel(af, semantics)
+    return kernel
+
+
+if __name__ == "__main__":
+    from semantics import SEMANTICS
+
+    parser = argparse.ArgumentParser(description="Reduce a framework to its kernel.")
+    parser.add_argument("data_file", type=str, help="The path to the data file.")
+    parser.add_argument(
+        "arguments", nargs="*", help="Queried arguments (default: all of them)."
+    )
+    parser.add_argument(
+        "--semantics",
+        choices=SEMANTICS,
+        default="admissible",
+        help="Semantics the kernel is for (default: admissible).",
+    )
+    args = parser.parse_args()
+
+    af = load_framework(args.data_file)
+    try:
+        kernel = kernelize(af, args.semantics, args.arguments or None)
+    except ValueError as e:
+        parser.error(str(e))
+    decided_in = sum(1 for label in kernel.status.values() if label == IN)
+    print(
+        f"{af.n} arguments, {af.n_attacks} attacks -> kernel of {kernel.af.n} arguments, "
+        f"{kernel.af.n_attacks} attacks ({decided_in} IN and "
+        f"{len(kernel.status) - decided_in} OUT decided by the reduction)"
+    )
+    for name in args.arguments:
+        if name in kernel.status:
+            print(f"{name}: {'IN' if kernel.status[name] == IN else 'OUT'}")
+        else:
+            print(f"{name}: kernel argument {kernel.representative[name]}")
@@ -0,0 +1,127 @@
+import instrument
+
+IN = 0
+OUT = 1
+MUST_OUT = 2
+BLANK = 3
+UNDEC = 4
+
+
+# Backtracking labelling search for credulous acceptance under admissible semantics.
+#   IN       -> the argument is in the candidate extension
+#   OUT      -> the argument is attacked by the candidate extension
+#   MUST_OUT -> the argument attacks the extension but is not attacked back (yet)
+#   BLANK    -> nothing decided yet
+#   UNDEC    -> excluded from the extension by an earlier branch
+# A labelling without MUST_OUT arguments gives an admissible set.
+# Works on the integer ids of a framework.Framework.
+class CredulousLabelling:
+    def __init__(self, af):
+        self.af = af
+        self.attackers = [tuple(af.attackers(i)) for i in range(af.n)]
+        self.targets = [tuple(af.targets(i)) for i in range(af.n)]
+
+    # Return an admissible set (as a set of names) containing the argument, or None
+    def find_witness(self, argument):
+        witness = self.find_witness_ids([self.af.index[argument]])
+        return None if witness is None else {self.af.names[i] for i in witness}
+
+    # Admissible set containing all the given ids, or None
+    def find_witness_ids(self, ids):
+        labels = bytearray([BLANK]) * self.af.n
+        must_out = set()
+        for i in ids:
+            if not self.set_in(labels, must_out, i):
+                return None
+
+        stack = [(labels, must_out)]
+        while stack:
+            labels, must_out = stack.pop()
+            if instrument.enabled:
+                instrument.count("labelling.nodes")
+            ok, target = self.propagate(labels, must_out)
+            if not ok:
+                continue
+            if target is None:
+                return [a for a, label in enumerate(labels) if label == IN]
+
+            # Branch i labels the i-th defender IN and the ones before it UNDEC,
+            # so no admissible set is visited twice.
+            branches = []
+            excluded = []
+            for defender in self.order_defenders(labels, must_out, target):
+                branch_labels = bytearray(labels)
+                branch_must_out = set(must_out)
+                for other in excluded:
+                    branch_labels[other] = UNDEC
+                if self.set_in(branch_labels, branch_must_out, defender):
+                    branches.append((branch_labels, branch_must_out))
+                excluded.append(defender)
+            stack.extend(reversed(branches))
+        return None
+
+    def is_eligible(self, labels, i):
+        return labels[i] == BLANK and not self.af.is_self_attacking(i)
+
+    # Label an argument IN and update its attackers and the arguments it attacks
+    def set_in(self, labels, must_out, i):
+        if not self.is_eligible(labels, i):
+            return False
+        labels[i] = IN
+        for target in self.targets[i]:
+            if labels[target] == IN:
+                return False
+            must_out.discard(target)
+            labels[target] = OUT
+        for attacker in self.attackers[i]:
+            if labels[attacker] == IN:
+                return False
+            if labels[attacker] in (BLANK, UNDEC):
+                labels[attacker] = MUST_OUT
+                must_out.add(attacker)
+        return True
+
+    # Unit propagation: a MUST_OUT argument with one eligible attacker forces it IN.
+    # Returns (ok, target) where target is the MUST_OUT argument to branch on next,
+    # or None when the labelling is already admissible.
+    def propagate(self, labels, must_out):
+        while True:
+            target = None
+            target_options = None
+            forced = None
+            for i in must_out:
+                options = sum(
+                    1 for attacker in self.attackers[i] if self.is_eligible(labels, attacker)
+                )
+                if options == 0:
+                    return False, None
+                if options == 1:
+                    forced = i
+                    break
+                if target_options is None or options < target_options:
+                    target, target_options = i, options
+            if forced is None:
+                return True, target
+            defender = next(
+                attacker
+                for attacker in self.attackers[forced]
+                if self.is_eligible(labels, attacker)
+            )
+            if not self.set_in(labels, must_out, defender):
+                return False, None
+
+    # Try unattacked defenders first, then the ones that resolve the most MUST_OUT arguments
+    def order_defenders(self, labels, must_out, target):
+        defenders = [
+            attacker
+            for attacker in self.attackers[target]
+            if self.is_eligible(labels, attacker)
+        ]
+        return sorted(
+            defenders,
+            key=lambda d: (
+                sum(1 for a in self.attackers[d] if labels[a] != OUT),
+                -sum(1 for t in self.targets[d] if t in must_out),
+            ),
+        )
+
@@ -0,0 +1,120 @@
+import io
+import os
+import random
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from framework import load_framework
+from game import Game
+from policies import opponent_policy
+import strategy
+
+
+# Parallel AutoGame runs. Games of each file are split into fixed-size chunks, and
+# every chunk gets its own RNG seeded from (seed, file name, chunk), so the results
+# only depend on the seed, not on the number of workers or the scheduling.
+
+
+def preload(data_files):
+    # Each worker parses every framework once, games then reuse the cached index
+    for data_file in data_files:
+        load_framework(data_file)
+
+
+def play_chunk(task):
+    (
+        data_file,
+        claimed_argument,
+        game_numbers,
+        seed,
+        save_res_dir,
+        keep_records,
+        opponent,
+    ) = task
+    rng = random.Random(seed)
+    choose_opponent_move = opponent_policy(opponent, rng)
+    results = []
+    records = []
+    for n in game_numbers:
+        game = Game(
+            data_file=data_file,
+            claimed_argument=claimed_argument,
+            verbose=False,
+            save_res_dir=save_res_dir,
+            add_game_text=True,
+            choose_proponent_move=lambda game, options: strategy.choose_proponent_move(
+                game.af, options, game.opponent_mask, claim=game.claimed_argument
+            ),
+            choose_opponent_move=choose_opponent_move,
+            headless=True,
+        )
+        game.claimed_argument = (
+            rng.choice(game.af.names) if claimed_argument is None else claimed_argument
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            game.play()
+        results.append({"game_number": n, "winner": game.winner})
+        if keep_records:
+            records.append(game.record())
+    return os.path.basename(data_file), results, records
+
+
+def make_tasks(
+    data_files,
+    n_games,
+    claimed_argument,
+    seed,
+    save_res_dir,
+    keep_records,
+    chunk_size,
+    opponent="random",
+):
+    tasks = []
+    for data_file in data_files:
+        name = os.path.basename(data_file)
+        for chunk, start in enumerate(range(0, n_games, chunk_size)):
+            tasks.append(
+                (
+                    data_file,
+                    claimed_argument,
+                    range(start, min(start + chunk_size, n_games)),
+                    f"{seed}:{name}:{chunk}",
+                    save_res_dir,
+                    keep_records,
+                    opponent,
+                )
+            )
+    return tasks
+
+
+# Play n_games per file over a process pool, yielding (file name, results, records)
+# for every chunk as soon as it is done. With keep_records the headless game records
+# are returned too, for the results sink or for later rendering.
+def iter_parallel(
+    data_files,
+    n_games,
+    claimed_argument=None,
+    workers=None,
+    seed=0,
+    save_res_dir=None,
+    keep_records=False,
+    chunk_size=25,
+    opponent="random",
+):
+    workers = workers or os.cpu_count() or 1
+    tasks = make_tasks(
+        data_files,
+        n_games,
+        claimed_argument,
+        seed,
+        save_res_dir,
+        keep_records,
+        chunk_size,
+        opponent,
+    )
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=preload, initargs=(data_files,)
+    ) as pool:
+        futures = [pool.submit(play_chunk, task) for task in tasks]
+        for future in as_completed(futures):
+            yield future.result()
+
@@ -0,0 +1,86 @@
+import random
+import strategy
+
+# Opponent policies for AutoGame, called as policy(game, options) like Game's
+# choose_opponent_move. options are the opponent's legal moves, duplicates included
+# (an attacker of several proponent arguments is listed once per argument).
+# deterministic policies always pick the same move in the same position, which lets
+# the adaptive runner stop after one game when the rest of the game is fixed too.
+
+
+# Uniform choice among the options (the historical AutoGame opponent)
+class RandomOpponent:
+    deterministic = False
+
+    def __init__(self, rng=None):
+        self.rng = rng or random
+        # Set when a game asked for a real choice; reset by the runner between games
+        self.branched = False
+
+    def __call__(self, game, options):
+        if len(set(options)) > 1:
+            self.branched = True
+        return self.rng.choice(options)
+
+
+# Myopic: a proponent argument ends the game at once (contradiction), otherwise the
+# option with the fewest attackers, which leaves the proponent the fewest answers
+class GreedyOpponent:
+    deterministic = True
+
+    def __call__(self, game, options):
+        return min(
+            options,
+            key=lambda option: (
+                not game.state.is_proponent(game.af.index[option]),
+                len(game.af.attackers(game.af.index[option])),
+            ),
+        )
+
+
+# Adversarial, from the exact game solution (strategy.StrategyTable): the move after
+# which the proponent has no winning strategy, ties broken by the lowest proponent win
+# probability. Against it the proponent only wins from positions with a forced win.
+# On frameworks too big for the table it plays like GreedyOpponent.
+class MinimaxOpponent:
+    deterministic = True
+
+    def __init__(self):
+        self.greedy = GreedyOpponent()
+        self.too_large = set()  # frameworks the table could not solve
+
+    def __call__(self, game, options):
+        if game.af not in self.too_large:
+            try:
+                return self.minimax_move(game, options)
+            except (strategy.TableTooLarge, RecursionError) as e:
+                self.too_large.add(game.af)
+                print(f"{e} The opponent plays the greedy policy instead.")
+        return self.greedy(game, options)
+
+    def minimax_move(self, game, options):
+        table = strategy.strategy_table(game.af)
+
+        def value(option):
+            move = game.af.index[option]
+            if game.state.is_proponent(move):
+                return (False, 0.0)
+            probability, forced = table.opponent_move_value(game.state, move)
+            return (forced, probability)
+
+        return min(options, key=value)
+
+
+OPPONENT_POLICIES = {
+    "random": RandomOpponent,
+    "greedy": GreedyOpponent,
+    "minimax": MinimaxOpponent,
+}
+
+
+def opponent_policy(name, rng=None):
+    if name not in OPPONENT_POLICIES:
+        raise ValueError(f"Unknown opponent policy '{name}'.")
+    if name == "random":
+        return RandomOpponent(rng)
+    return OPPONENT_POLICIES[name]()
@@ -0,0 +1,122 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import networkx as nx
+import matplotlib.pyplot as plt
+from framework import load_framework
+import instrument
+
+
+# Drawing of game states. The networkx graph and its spring layout are built once per
+# framework and cached on it, so every step and every game reuses them.
+# This is the only module importing networkx and matplotlib; the game and solver
+# modules import it when something is drawn, so headless runs never load them.
+
+
+def graph(af):
+    G = getattr(af, "_graph", None)
+    if G is None:
+        G = nx.DiGraph()
+        G.add_nodes_from(af.names)
+        G.add_edges_from(af.edges())
+        af._graph = G
+    return G
+
+
+def layout(af):
+    pos = getattr(af, "_layout", None)
+    if pos is None:
+        with instrument.timer("render.layout"):
+            pos = nx.spring_layout(graph(af), seed=10)
+        af._layout = pos
+    return pos
+
+
+@instrument.timed("render.draw")
+def draw_state(af, proponent_arguments, opponent_arguments, game_text=None):
+    G = graph(af)
+    pos = layout(af)
+    plt.figure(figsize=(16, 10))
+    nx.draw_networkx_nodes(G, pos, nodelist=proponent_arguments, node_color="blue")
+    nx.draw_networkx_nodes(G, pos, nodelist=opponent_arguments, node_color="red")
+    nx.draw_networkx_edges(G, pos, edge_color="black", arrowstyle="->", arrowsize=20)
+    nx.draw_networkx_labels(G, pos, font_size=12)
+
+    if game_text is not None:
+        plt.text(
+            0.5,
+            0.05,
+            game_text,
+            ha="center",
+            va="center",
+            transform=plt.gcf().transFigure,
+        )
+
+    plt.subplots_adjust(left=0.1, right=0.9, top=0.9, bottom=0.15)
+
+
+def save(path):
+    plt.savefig(path)
+
+
+def show():
+    plt.show(block=False)
+
+
+def close():
+    plt.close()
+
+
+def step_image_path(save_graph_dir, data_file, claimed_argument, game_id, step):
+    data_file_name = os.path.splitext(os.path.basename(data_file))[0]
+    directory = os.path.join(
+        save_graph_dir,
+        data_file_name,
+        f"{data_file_name}_claimed_{claimed_argument}_{game_id}",
+    )
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(
+        directory, f"{data_file_name}_claimed_{claimed_argument}_step_{step}.png"
+    )
+
+
+# Render the step images of a game recorded in headless mode (see Game.record)
+def render_game(record, save_graph_dir, add_game_text=True):
+    af = load_framework(record["data_file"])
+    for step, (n_proponent, n_opponent, n_text) in enumerate(record["frames"], start=1):
+        draw_state(
+            af,
+            record["proponent_arguments"][:n_proponent],
+            record["opponent_arguments"][:n_opponent],
+            record["game_text"][:n_text] if add_game_text else None,
+        )
+        with instrument.timer("render.save"):
+            plt.savefig(
+                step_image_path(
+                    save_graph_dir,
+                    record["data_file"],
+                    record["claimed_argument"],
+                    record["id"],
+                    step,
+                )
+            )
+        plt.close()
+    return len(record["frames"])
+
+
+# Render many recorded games over a process pool (workers=None: one per CPU), or in
+# this process with workers=1; returns the number of images
+def render_games(records, save_graph_dir, add_game_text=True, workers=None):
+    if not records:
+        return 0
+    if workers == 1:
+        return sum(render_game(record, save_graph_dir, add_game_text) for record in records)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return sum(
+            pool.map(
+                partial(
+                    render_game, save_graph_dir=save_graph_dir, add_game_text=add_game_text
+                ),
+                records,
+            )
+        )
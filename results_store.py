@@ -0,0 +1,102 @@
+import re
+import json
+from collections import Counter
+import instrument
+
+# Append-only game results in JSON Lines, one game per line with a fixed field order.
+# framework and winner come first so winner_counts can read them from the start of
+# each line without decoding the rest of the record.
+FIELDS = (
+    "framework",
+    "winner",
+    "game_number",
+    "claimed_argument",
+    "game_id",
+    "proponent_arguments",
+    "opponent_arguments",
+    "game_text",
+)
+
+_JSON_STRING = rb'"(?:[^"\\]|\\.)*"'
+_PREFIX = re.compile(
+    rb'\{"framework": (' + _JSON_STRING + rb'), "winner": (' + _JSON_STRING + rb"|null)"
+)
+
+
+class ResultsSink:
+    def __init__(self, path, flush_every=100):
+        self.path = path
+        self.flush_every = flush_every
+        self.file = open(path, "a", encoding="utf-8")
+        self.pending = 0
+
+    @instrument.timed("results.write")
+    def write(self, record):
+        self.file.write(json.dumps({field: record.get(field) for field in FIELDS}))
+        self.file.write("\n")
+        self.pending += 1
+        if self.pending >= self.flush_every:
+            self.flush()
+
+    @instrument.timed("results.flush")
+    def flush(self):
+        self.file.flush()
+        self.pending = 0
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Sink record for a finished game (see Game.record)
+def game_result(framework, game_number, record):
+    return {
+        "framework": framework,
+        "winner": record["winner"],
+        "game_number": game_number,
+        "claimed_argument": record["claimed_argument"],
+        "game_id": record["id"],
+        "proponent_arguments": record["proponent_arguments"],
+        "opponent_arguments": record["opponent_arguments"],
+        "game_text": record["game_text"],
+    }
+
+
+def iter_results(path):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+# {framework: {"Proponent": n, "Opponent": n}} using only the line prefixes
+def winner_counts(path):
+    raw = Counter()
+    with open(path, "rb") as f:
+        for line in f:
+            match = _PREFIX.match(line)
+            if match:
+                raw[match.groups()] += 1
+    counts = {}
+    for (framework, winner), n in raw.items():
+        framework_counts = counts.setdefault(
+            json.loads(framework), {"Proponent": 0, "Opponent": 0}
+        )
+        winner = json.loads(winner)
+        framework_counts[winner] = framework_counts.get(winner, 0) + n
+    return counts
+
+
+# The old results.json layout: {framework: [{"game_number": n, "winner": w}, ...]}
+def to_results_dict(path):
+    results = {}
+    for record in iter_results(path):
+        results.setdefault(record["framework"], []).append(
+            {"game_number": record["game_number"], "winner": record["winner"]}
+        )
+    return results
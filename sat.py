@@ -0,0 +1,258 @@
+import os
+import argparse
+
+try:
+    from pysat.solvers import Solver
+except ImportError:  # pysat is optional, see SOLVERS
+    Solver = None
+try:
+    import pycosat
+except ImportError:
+    pycosat = None
+
+from framework import load_framework
+from scc import cone_framework
+import semantics as native
+
+# SAT backend for acceptance queries. Admissible, complete and stable semantics are
+# encoded as CNF over one variable per argument (x_i = i + 1, "i is in the set"),
+# plus one per argument for complete semantics (o_i = n + i + 1, "i is attacked
+# by the set"):
+#   conflict-free  not x_a or not x_b                   for every attack b -> a
+#   admissible     x_a -> OR(x_c for c attacking b)     for every attacker b of a
+#   complete       o_b <-> OR(x_c for c attacking b),  x_a <-> AND(o_b for b attacking a)
+#   stable         x_a or OR(x_b for b attacking a)     (in, or attacked by the set)
+# Credulous acceptance adds the unit x_a, skeptical acceptance looks for a model with
+# not x_a. Solved with pysat or pycosat when installed, otherwise with the small
+# DPLL solver below. Other semantics are answered by the native engine.
+
+SAT_SEMANTICS = ("admissible", "complete", "stable")
+SOLVERS = tuple(
+    name
+    for name, available in (("pysat", Solver), ("pycosat", pycosat), ("dpll", True))
+    if available
+)
+
+
+def conflict_free_clauses(af):
+    return [[-(a + 1), -(b + 1)] for a in range(af.n) for b in af.attackers(a)]
+
+
+def encode(af, semantics="admissible"):
+    if semantics not in SAT_SEMANTICS:
+        raise ValueError(f"No CNF encoding for '{semantics}' semantics.")
+    clauses = conflict_free_clauses(af)
+    n = af.n
+    for a in range(n):
+        attackers = af.attackers(a)
+        if semantics == "admissible":
+            for b in attackers:
+                clauses.append([-(a + 1)] + [c + 1 for c in af.attackers(b)])
+        elif semantics == "complete":
+            o = n + a + 1
+            clauses.append([-o] + [c + 1 for c in attackers])
+            clauses.extend([o, -(c + 1)] for c in attackers)
+            clauses.append([a + 1] + [-(n + b + 1) for b in attackers])
+            clauses.extend([-(a + 1), n + b + 1] for b in attackers)
+        else:
+            clauses.append([a + 1] + [b + 1 for b in attackers])
+    return clauses
+
+
+# A model (list of true variables) of the clauses under the assumptions, or None
+def solve(clauses, assumptions=(), solver=None):
+    solver = solver or SOLVERS[0]
+    if solver == "pysat":
+        with Solver(name="g4", bootstrap_with=clauses) as s:
+            return [v for v in s.get_model() if v > 0] if s.solve(assumptions) else None
+    if solver == "pycosat":
+        model = pycosat.solve(list(clauses) + [[a] for a in assumptions])
+        return None if model == "UNSAT" else [v for v in model if v > 0]
+    if solver == "dpll":
+        return dpll(clauses, assumptions)
+    raise ValueError(f"Unknown SAT solver '{solver}'.")
+
+
+# Plain DPLL with two watched literals and chronological backtracking. Variables are
+# decided false first, which keeps the witnesses small.
+def dpll(clauses, assumptions=()):
+    clauses = [list(dict.fromkeys(c)) for c in clauses]
+    n_vars = max((abs(l) for c in clauses for l in c), default=0)
+    n_vars = max([n_vars] + [abs(a) for a in assumptions])
+    value = [0] * (n_vars + 1)  # 1 true, -1 false, 0 unassigned
+    watches = {}
+    trail = []
+
+    def assign(literal):
+        value[abs(literal)] = 1 if literal > 0 else -1
+        trail.append(literal)
+
+    def literal_value(literal):
+        return value[abs(literal)] if literal > 0 else -value[abs(literal)]
+
+    units = list(assumptions)
+    for index, clause in enumerate(clauses):
+        if not clause:
+            return None
+        if len(clause) == 1:
+            units.append(clause[0])
+        else:
+            watches.setdefault(clause[0], []).append(index)
+            watches.setdefault(clause[1], []).append(index)
+    for literal in units:
+        if literal_value(literal) < 0:
+            return None
+        if literal_value(literal) == 0:
+            assign(literal)
+
+    def propagate(head):
+        while head < len(trail):
+            false_literal = -trail[head]
+            head += 1
+            watching = watches.get(false_literal, [])
+            keep = []
+            for position, index in enumerate(watching):
+                clause = clauses[index]
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if literal_value(clause[0]) > 0:
+                    keep.append(index)
+                    continue
+                for k in range(2, len(clause)):
+                    if literal_value(clause[k]) >= 0:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        watches.setdefault(clause[1], []).append(index)
+                        break
+                else:
+                    keep.append(index)
+                    if literal_value(clause[0]) < 0:
+                        keep.extend(watching[position + 1 :])
+                        watches[false_literal] = keep
+                        return False
+                    assign(clause[0])
+            watches[false_literal] = keep
+        return True
+
+    decisions = []  # (trail length before the decision, literal, flipped)
+    head = 0
+    while True:
+        if propagate(head):
+            head = len(trail)
+            var = next((v for v in range(1, n_vars + 1) if not value[v]), None)
+            if var is None:
+                return [v for v in range(1, n_vars + 1) if value[v] > 0]
+            decisions.append((len(trail), -var, False))
+            assign(-var)
+            continue
+        while decisions:
+            length, literal, flipped = decisions.pop()
+            for undone in trail[length:]:
+                value[abs(undone)] = 0
+            del trail[length:]
+            if not flipped:
+                decisions.append((length, -literal, True))
+                assign(-literal)
+                break
+        else:
+            return None
+        head = length
+
+
+# Extension (list of names) containing the argument, or None. Directional semantics
+# are solved on the upstream cone only, as in semantics.is_credulously_accepted.
+def find_witness(af, argument, semantics="admissible", solver=None):
+    if semantics == "preferred":
+        semantics = "admissible"  # same credulous acceptance
+    if semantics != "stable":
+        af = cone_framework(af, argument)
+    model = solve(encode(af, semantics), [af.index[argument] + 1], solver)
+    if model is None:
+        return None
+    return [af.names[v - 1] for v in model if v <= af.n]
+
+
+def is_credulously_accepted(af, argument, semantics="admissible", solver=None):
+    if semantics not in SAT_SEMANTICS + ("preferred",):
+        return native_acceptance(af, argument, semantics, False)
+    return find_witness(af, argument, semantics, solver) is not None
+
+
+# Skeptically accepted iff no extension leaves the argument out
+def is_skeptically_accepted(af, argument, semantics="preferred", solver=None):
+    if semantics == "admissible":
+        return False  # the empty set is always admissible
+    if semantics not in ("complete", "stable"):
+        return native_acceptance(af, argument, semantics, True)
+    if semantics != "stable":
+        af = cone_framework(af, argument)
+    return solve(encode(af, semantics), [-(af.index[argument] + 1)], solver) is None
+
+
+def native_acceptance(af, argument, semantics, skeptical):
+    if semantics not in native.SEMANTICS:
+        raise ValueError(f"Unknown semantics '{semantics}'.")
+    if skeptical:
+        return native.is_skeptically_accepted(af, argument, semantics)
+    return native.is_credulously_accepted(af, argument, semantics)
+
+
+# Compare the SAT answers with the native engine on every argument of the framework,
+# returns the disagreements as (argument, semantics, mode, native, sat) tuples.
+# Credulous witnesses are also checked to be admissible sets containing the argument.
+def crosscheck(af, solver=None, semantics_list=SAT_SEMANTICS):
+    mismatches = []
+    for name in af.names:
+        for semantics in semantics_list:
+            for mode, native_answer, sat_answer in (
+                (
+                    "credulous",
+                    native.is_credulously_accepted,
+                    is_credulously_accepted,
+                ),
+                (
+                    "skeptical",
+                    native.is_skeptically_accepted,
+                    is_skeptically_accepted,
+                ),
+            ):
+                expected = native_answer(af, name, semantics)
+                answer = sat_answer(af, name, semantics, solver)
+                if expected != answer:
+                    mismatches.append((name, semantics, mode, expected, answer))
+            witness = find_witness(af, name, semantics, solver)
+            if witness is not None and (
+                name not in witness or not af.is_admissible(af.mask(witness))
+            ):
+                mismatches.append((name, semantics, "witness", None, witness))
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Cross-check the SAT backend against the native engine."
+    )
+    parser.add_argument(
+        "data_path",
+        nargs="?",
+        default="Argumentation_Framework_tests",
+        help="A data file or a directory of them.",
+    )
+    parser.add_argument("--solver", choices=SOLVERS, help="SAT solver to use.")
+    args = parser.parse_args()
+
+    if os.path.isdir(args.data_path):
+        data_files = [
+            os.path.join(args.data_path, filename)
+            for filename in sorted(os.listdir(args.data_path))
+            if filename.endswith(".json")
+        ]
+    else:
+        data_files = [args.data_path]
+    failed = False
+    for data_file in data_files:
+        mismatches = crosscheck(load_framework(data_file), args.solver)
+        print(f"{os.path.basename(data_file)}: {len(mismatches)} mismatches")
+        for mismatch in mismatches:
+            print("   ", mismatch)
+        failed = failed or bool(mismatches)
+    exit(1 if failed else 0)
@@ -0,0 +1,109 @@
+# Strongly connected component decomposition of a framework.
+#
+# Acceptance of an argument under admissible, grounded, complete and preferred
+# semantics only depends on the arguments that can reach it through attacks
+# (directionality), i.e. on the SCCs upstream of its own SCC. Queries are solved on
+# that cone only, and every argument of an SCC shares the same cached cone.
+class Decomposition:
+    def __init__(self, af):
+        self.af = af
+        self.components = strongly_connected_components(af)  # topological order
+        self.component_of = [0] * af.n
+        for c, members in enumerate(self.components):
+            for i in members:
+                self.component_of[i] = c
+        self.parents = [set() for _ in self.components]  # upstream components
+        for c, members in enumerate(self.components):
+            for i in members:
+                for attacker in af.attackers(i):
+                    if self.component_of[attacker] != c:
+                        self.parents[c].add(self.component_of[attacker])
+        self._cones = {}
+
+    # Ids of the arguments upstream of argument i (including its own SCC),
+    # in topological SCC order
+    def cone(self, i):
+        return [
+            j for c in self.upstream_components(self.component_of[i]) for j in self.components[c]
+        ]
+
+    def upstream_components(self, c):
+        seen = {c}
+        stack = [c]
+        while stack:
+            for parent in self.parents[stack.pop()]:
+                if parent not in seen:
+                    seen.add(parent)
+                    stack.append(parent)
+        return sorted(seen)
+
+    # Sub-framework of the cone of argument i, or the framework itself when the
+    # cone is everything. Cached per SCC, so its grounded labels and acceptance
+    # results are reused by every argument of the SCC.
+    def cone_framework(self, i):
+        c = self.component_of[i]
+        sub = self._cones.get(c)
+        if sub is None:
+            cone = self.cone(i)
+            sub = self.af if len(cone) == self.af.n else self.af.subframework(cone)
+            self._cones[c] = sub
+        return sub
+
+
+def decomposition(af):
+    result = getattr(af, "_scc", None)
+    if result is None:
+        result = Decomposition(af)
+        af._scc = result
+    return result
+
+
+# Iterative Tarjan over the attack relation. Tarjan emits sink components first,
+# so the result is reversed to list unattacked components first.
+def strongly_connected_components(af):
+    index = [-1] * af.n
+    low = [0] * af.n
+    on_stack = bytearray(af.n)
+    stack = []
+    components = []
+    counter = 0
+    for root in range(af.n):
+        if index[root] != -1:
+            continue
+        work = [(root, 0)]
+        while work:
+            v, position = work[-1]
+            if position == 0:
+                index[v] = low[v] = counter
+                counter += 1
+                stack.append(v)
+                on_stack[v] = 1
+            targets = af.targets(v)
+            if position < len(targets):
+                work[-1] = (v, position + 1)
+                w = targets[position]
+                if index[w] == -1:
+                    work.append((w, 0))
+                elif on_stack[w]:
+                    low[v] = min(low[v], index[w])
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[v])
+            if low[v] == index[v]:
+                component = []
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = 0
+                    component.append(w)
+                    if w == v:
+                        break
+                components.append(sorted(component))
+    components.reverse()
+    return components
+
+
+# Smallest framework that decides the argument under directional semantics
+def cone_framework(af, argument):
+    return decomposition(af).cone_framework(af.index[argument])
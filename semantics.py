@@ -0,0 +1,272 @@
+from itertools import islice
+from grounded import grounded_labelling
+from labelling import IN, OUT, BLANK, UNDEC, CredulousLabelling
+from scc import cone_framework, decomposition
+from kernel import framework_kernel
+import instrument
+
+SEMANTICS = ("admissible", "grounded", "complete", "preferred", "stable")
+
+
+# Depth-first enumeration of complete labellings (IN/OUT/UNDEC), one at a time.
+# Starts from the grounded labelling, which every complete labelling agrees with on
+# IN and OUT, and branches IN, OUT, UNDEC on the remaining BLANK arguments. After
+# every assignment the legality rules are re-checked on the neighbourhood:
+#   IN    -> all attackers OUT
+#   OUT   -> some attacker IN
+#   UNDEC -> no attacker IN and some attacker UNDEC
+# With stable=True UNDEC is never allowed, so the labellings are the stable ones.
+class CompleteLabelling:
+    def __init__(self, af, stable=False):
+        self.af = af
+        self.stable = stable
+        self.attackers = [tuple(af.attackers(i)) for i in range(af.n)]
+        self.targets = [tuple(af.targets(i)) for i in range(af.n)]
+
+    # Generator of complete (or stable) labellings with the given ids labelled IN
+    def labellings(self, forced_in=()):
+        labels = bytearray(grounded_labelling(self.af))
+        for i, label in enumerate(labels):
+            if label == UNDEC:
+                labels[i] = BLANK
+        worklist = list(range(self.af.n))
+        for i in forced_in:
+            if labels[i] == BLANK:
+                self.assign(labels, worklist, i, IN)
+            elif labels[i] != IN:
+                return
+
+        stack = [(labels, worklist)]
+        while stack:
+            labels, worklist = stack.pop()
+            if not self.propagate(labels, worklist):
+                continue
+            blank = self.choose_blank(labels)
+            if blank is None:
+                yield labels
+                continue
+            branches = []
+            for label in (IN, OUT) if self.stable else (IN, OUT, UNDEC):
+                branch = bytearray(labels)
+                branch_worklist = []
+                self.assign(branch, branch_worklist, blank, label)
+                branches.append((branch, branch_worklist))
+            stack.extend(reversed(branches))
+
+    def assign(self, labels, worklist, i, label):
+        labels[i] = label
+        worklist.append(i)
+        worklist.extend(self.attackers[i])
+        worklist.extend(self.targets[i])
+
+    def propagate(self, labels, worklist):
+        while worklist:
+            i = worklist.pop()
+            label = labels[i]
+            n_in = n_undec = 0
+            blank = []
+            for attacker in self.attackers[i]:
+                attacker_label = labels[attacker]
+                if attacker_label == IN:
+                    n_in += 1
+                elif attacker_label == UNDEC:
+                    n_undec += 1
+                elif attacker_label == BLANK:
+                    blank.append(attacker)
+
+            if label == BLANK:
+                if n_in:
+                    self.assign(labels, worklist, i, OUT)
+                elif not blank and not n_undec:
+                    self.assign(labels, worklist, i, IN)
+                elif not blank and not self.stable:
+                    self.assign(labels, worklist, i, UNDEC)
+                elif not blank:
+                    return False
+            elif label == IN:
+                if n_in or n_undec:
+                    return False
+                for attacker in blank:
+                    self.assign(labels, worklist, attacker, OUT)
+            elif label == OUT:
+                if n_in:
+                    continue
+                if not blank:
+                    return False
+                if len(blank) == 1:
+                    self.assign(labels, worklist, blank[0], IN)
+            elif label == UNDEC:
+                if self.stable or n_in or not (n_undec or blank):
+                    return False
+                if not n_undec and len(blank) == 1:
+                    self.assign(labels, worklist, blank[0], UNDEC)
+        return True
+
+    # Branch on the most connected undecided argument
+    def choose_blank(self, labels):
+        best = None
+        best_degree = -1
+        for i, label in enumerate(labels):
+            if label == BLANK:
+                degree = len(self.attackers[i]) + len(self.targets[i])
+                if degree > best_degree:
+                    best, best_degree = i, degree
+        return best
+
+
+# Extension generators, each extension is a list of argument ids
+
+
+def grounded_extensions(af):
+    yield [i for i, label in enumerate(grounded_labelling(af)) if label == IN]
+
+
+def complete_extensions(af):
+    for labels in CompleteLabelling(af).labellings():
+        yield [i for i, label in enumerate(labels) if label == IN]
+
+
+def stable_extensions(af):
+    for labels in CompleteLabelling(af, stable=True).labellings():
+        yield [i for i, label in enumerate(labels) if label == IN]
+
+
+# A complete extension is preferred unless one of its UNDEC arguments can be added to
+# an admissible superset (OUT arguments are attacked by it and can never be added).
+def preferred_extensions(af):
+    solver = CredulousLabelling(af)
+    for labels in CompleteLabelling(af).labellings():
+        extension = [i for i, label in enumerate(labels) if label == IN]
+        undecided = [i for i, label in enumerate(labels) if label == UNDEC]
+        if not any(
+            solver.find_witness_ids(extension + [i]) is not None for i in undecided
+        ):
+            yield extension
+
+
+GENERATORS = {
+    "grounded": grounded_extensions,
+    "complete": complete_extensions,
+    "preferred": preferred_extensions,
+    "stable": stable_extensions,
+}
+
+
+# Lazily yield the extensions (as lists of names), stopping after limit of them
+def extensions(af, semantics, limit=None):
+    if semantics not in GENERATORS:
+        raise ValueError(f"Cannot enumerate extensions under '{semantics}' semantics.")
+    for extension in islice(GENERATORS[semantics](af), limit):
+        yield [af.names[i] for i in extension]
+
+
+# Credulous acceptance of every argument in one pass, as a list indexed by argument id.
+# The kernel decides the grounded IN and OUT arguments (and the irrelevant
+# self-attackers), the search runs on the kernel, and twins share their answer.
+# find_witness(af, name, semantics) -> names or None replaces the native search
+# (e.g. sat.find_witness).
+def credulous_acceptance(af, semantics="admissible", find_witness=None):
+    if semantics not in SEMANTICS:
+        raise ValueError(f"Unknown semantics '{semantics}'.")
+    if semantics == "grounded":
+        return [label == IN for label in grounded_labelling(af)]
+    kernel = framework_kernel(af, semantics)
+    core = kernel.af
+    core_accepted = search_acceptance(core, semantics, find_witness)
+    if semantics == "stable" and core.n and not any(core_accepted):
+        return [False] * af.n  # no stable extension at all
+    accepted = [kernel.status.get(name) == IN for name in af.names]
+    for name, ok in zip(core.names, core_accepted):
+        if ok:
+            for member in kernel.members[name]:
+                accepted[af.index[member]] = True
+    return accepted
+
+
+# Credulous acceptance on a kernel (nothing decided by the grounded labelling). Every
+# witness found marks all its members accepted, so only the arguments left over get
+# a search. Sinks are searched first (their witnesses reach furthest upstream), each
+# on its cone with one search object per SCC cone.
+def search_acceptance(af, semantics, find_witness=None):
+    accepted = [False] * af.n
+    decided = [False] * af.n
+    stable = CompleteLabelling(af, stable=True) if semantics == "stable" else None
+    searches = {}
+
+    def witness_ids(i):
+        name = af.names[i]
+        if find_witness is not None:
+            witness = find_witness(af, name, semantics)
+            return None if witness is None else [af.index[w] for w in witness]
+        if semantics == "stable":
+            witness = next(stable.labellings(forced_in=[i]), None)
+            return None if witness is None else [j for j, l in enumerate(witness) if l == IN]
+        cone = cone_framework(af, name)
+        if cone not in searches:
+            searches[cone] = CredulousLabelling(cone)
+        witness = searches[cone].find_witness_ids([cone.index[name]])
+        return None if witness is None else [af.index[cone.names[j]] for j in witness]
+
+    for component in reversed(decomposition(af).components):
+        for i in component:
+            if decided[i]:
+                continue
+            decided[i] = True
+            for j in witness_ids(i) or ():
+                accepted[j] = decided[j] = True
+    return accepted
+
+
+def has_stable_extension(af):
+    exists = getattr(af, "_has_stable", None)
+    if exists is None:
+        exists = af.n == 0 or next(CompleteLabelling(af, stable=True).labellings(), None) is not None
+        af._has_stable = exists
+    return exists
+
+
+# Is the argument in at least one extension? Solved on the kernel of the upstream
+# cone (every semantics except stable is directional, stable uses the whole kernel).
+@instrument.timed("credulous")
+def is_credulously_accepted(af, argument, semantics="admissible"):
+    if semantics != "stable":
+        af = cone_framework(af, argument)
+    if semantics == "grounded":
+        return grounded_labelling(af)[af.index[argument]] == IN
+    kernel = framework_kernel(af, semantics)
+    name = kernel.argument(argument)
+    if name is None:
+        # Grounded IN arguments are in every extension, if there is one
+        accepted = kernel.status[argument] == IN
+        return accepted and (semantics != "stable" or has_stable_extension(kernel.af))
+    core = kernel.af
+    if semantics == "stable":
+        labellings = CompleteLabelling(core, stable=True).labellings(forced_in=[core.index[name]])
+        return next(labellings, None) is not None
+    # admissible, complete and preferred share credulous acceptance
+    core = cone_framework(core, name)
+    return CredulousLabelling(core).find_witness_ids([core.index[name]]) is not None
+
+
+# Is the argument in every extension? Stops at the first counterexample.
+def is_skeptically_accepted(af, argument, semantics="preferred"):
+    if semantics == "admissible":
+        return False  # the empty set is always admissible
+    if semantics != "stable":
+        af = cone_framework(af, argument)
+    if semantics in ("grounded", "complete"):
+        return grounded_labelling(af)[af.index[argument]] == IN
+    kernel = framework_kernel(af, semantics)
+    name = kernel.argument(argument)
+    if name is None:
+        # With no stable extension at all, every argument is skeptically accepted
+        return kernel.status[argument] == IN or (
+            semantics == "stable" and not has_stable_extension(kernel.af)
+        )
+    core = kernel.af
+    if semantics == "preferred":
+        core = cone_framework(core, name)
+        if CredulousLabelling(core).find_witness_ids([core.index[name]]) is None:
+            return False
+    i = core.index[name]
+    return all(i in extension for extension in GENERATORS[semantics](core))
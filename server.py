@@ -0,0 +1,289 @@
+import os
+import json
+import signal
+import socket
+import asyncio
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from framework import load_framework
+from semantics import (
+    SEMANTICS,
+    credulous_acceptance,
+    extensions,
+    is_credulously_accepted,
+    is_skeptically_accepted,
+)
+from parallel import preload
+from game_state import GameState
+import strategy
+
+# Local query server. Frameworks are loaded once (and reloaded only if their file
+# changes), so queries skip the process start, the JSON parsing and the indexing.
+#
+# The protocol is JSON Lines: each line is a request object, or an array of them for
+# a batch, and gets one line back with the answer (or the array of answers):
+#   {"id": 1, "op": "credulous", "framework": "AF_test_1.json", "argument": "A"}
+#   -> {"id": 1, "result": true}
+# Operations:
+#   credulous / skeptical  argument or arguments, semantics (admissible / preferred)
+#   acceptance             {argument: credulously accepted} for every argument, semantics
+#   best_move              options, opponent_arguments, optionally the claim (searches
+#                          its upstream cone only), and with "table": true the
+#                          exact strategy table move (needs proponent_arguments)
+#   extensions             semantics, limit
+#   frameworks             names of the preloaded frameworks
+# "framework" is the file name (or path) of one of the preloaded frameworks; other
+# files are refused, so clients cannot make the server read arbitrary paths.
+# Errors come back as {"id": ..., "error": "message"}, one per failed request of a
+# batch.
+
+
+def data_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                os.path.join(path, filename)
+                for filename in sorted(os.listdir(path))
+                if filename.endswith(".json")
+            )
+        else:
+            files.append(path)
+    return files
+
+
+class QueryHandler:
+    def __init__(self, files):
+        self.files = {os.path.basename(path): os.path.abspath(path) for path in files}
+        self.paths = set(self.files.values())
+
+    def framework(self, request):
+        name = request.get("framework")
+        if name is None:
+            raise ValueError("Missing 'framework'.")
+        path = self.files.get(name)
+        if path is None and isinstance(name, str) and os.path.abspath(name) in self.paths:
+            path = os.path.abspath(name)
+        if path is None:
+            raise ValueError(f"Unknown framework '{name}'.")
+        return load_framework(path)
+
+    def check_arguments(self, af, names):
+        for name in names:
+            if name not in af.index:
+                raise ValueError(f"The argument '{name}' does not appear in the AF.")
+
+    def credulous(self, request):
+        return self.query(request, is_credulously_accepted, "admissible")
+
+    def skeptical(self, request):
+        return self.query(request, is_skeptically_accepted, "preferred")
+
+    def query(self, request, accepted, default_semantics):
+        af = self.framework(request)
+        semantics = request.get("semantics", default_semantics)
+        if semantics not in SEMANTICS:
+            raise ValueError(f"Unknown semantics '{semantics}'.")
+        if "arguments" in request:
+            self.check_arguments(af, request["arguments"])
+            return [accepted(af, name, semantics) for name in request["arguments"]]
+        if "argument" not in request:
+            raise ValueError("Missing 'argument' or 'arguments'.")
+        self.check_arguments(af, [request["argument"]])
+        return accepted(af, request["argument"], semantics)
+
+    def acceptance(self, request):
+        af = self.framework(request)
+        semantics = request.get("semantics", "admissible")
+        if semantics not in SEMANTICS:
+            raise ValueError(f"Unknown semantics '{semantics}'.")
+        return dict(zip(af.names, credulous_acceptance(af, semantics)))
+
+    def best_move(self, request):
+        af = self.framework(request)
+        opponent_arguments = request.get("opponent_arguments", [])
+        self.check_arguments(af, opponent_arguments)
+        if request.get("table"):
+            proponent_arguments = request.get("proponent_arguments", [])
+            self.check_arguments(af, proponent_arguments)
+            if not opponent_arguments:
+                raise ValueError("The strategy table needs the opponent's last argument.")
+            if len(proponent_arguments) != len(opponent_arguments):
+                raise ValueError("It is not the proponent's turn.")
+            # Replay the record, so that the table searches from the position it reached
+            state = GameState.from_moves(af, proponent_arguments, opponent_arguments)
+            return strategy.strategy_table(af).best_move(state)
+        options = request.get("options")
+        if not options:
+            raise ValueError("Missing 'options'.")
+        self.check_arguments(af, options)
+        claim = request.get("claim")
+        if claim is not None:
+            self.check_arguments(af, [claim])
+        return strategy.choose_proponent_move(af, options, opponent_arguments, claim=claim)
+
+    def extensions(self, request):
+        af = self.framework(request)
+        return list(extensions(af, request.get("semantics", "preferred"), request.get("limit")))
+
+    def frameworks(self, request):
+        return sorted(self.files)
+
+    def answer(self, request):
+        if not isinstance(request, dict):
+            return {"error": "A request must be a JSON object."}
+        if request.get("op") not in OPERATIONS:
+            return {"id": request.get("id"), "error": f"Unknown op '{request.get('op')}'."}
+        try:
+            return {"id": request.get("id"), "result": getattr(self, request["op"])(request)}
+        # Any failure, e.g. a malformed field like a number for "arguments", is the
+        # answer to this request only, not the end of the connection and its batch
+        except Exception as e:
+            return {"id": request.get("id"), "error": str(e)}
+
+    # A line is one request or a batch of them
+    def answer_line(self, line):
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return {"error": f"Invalid JSON: {e}"}
+        if isinstance(request, list):
+            return [self.answer(r) for r in request]
+        return self.answer(request)
+
+
+OPERATIONS = ("credulous", "skeptical", "acceptance", "best_move", "extensions", "frameworks")
+
+_handler = None
+
+
+# Process pool workers: the handler lives in each worker, with the frameworks preloaded
+def init_worker(files):
+    global _handler
+    _handler = QueryHandler(files)
+    preload(files)
+
+
+def answer_in_worker(line):
+    return _handler.answer_line(line)
+
+
+class QueryServer:
+    def __init__(self, files, workers=0):
+        self.files = files
+        self.handler = QueryHandler(files)
+        preload(files)
+        # Without workers, queries are solved in the event loop one at a time (they
+        # are short); with workers they run concurrently in a process pool
+        self.pool = (
+            ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(files,))
+            if workers
+            else None
+        )
+
+    async def answer(self, line):
+        if self.pool is None:
+            return self.handler.answer_line(line)
+        return await asyncio.get_running_loop().run_in_executor(
+            self.pool, answer_in_worker, line
+        )
+
+    async def handle(self, reader, writer):
+        # Requests of a connection are answered in order; each connection is a task
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                response = await self.answer(line)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    # Big batches come as one line, well over the 64 KiB default of asyncio streams
+    line_limit = 2**26
+
+    async def serve(self, socket_path=None, host="127.0.0.1", port=8765):
+        if socket_path:
+            server = await asyncio.start_unix_server(
+                self.handle, path=socket_path, limit=self.line_limit
+            )
+            print(f"Serving {len(self.files)} frameworks on {socket_path}")
+        else:
+            server = await asyncio.start_server(self.handle, host, port, limit=self.line_limit)
+            print(f"Serving {len(self.files)} frameworks on {host}:{port}")
+        # Stop on SIGINT/SIGTERM, so the worker processes are shut down too
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, server.close)
+        async with server:
+            try:
+                await server.serve_forever()
+            except asyncio.CancelledError:
+                pass
+
+    def close(self):
+        if self.pool:
+            self.pool.shutdown()
+
+
+# Blocking client keeping one connection open for many queries
+class Client:
+    def __init__(self, socket_path=None, host="127.0.0.1", port=8765):
+        if socket_path:
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.connect(socket_path)
+        else:
+            self.socket = socket.create_connection((host, port))
+        self.file = self.socket.makefile("rwb")
+
+    # Send one request (dict) or a batch (list of dicts), return the answer(s)
+    def query(self, request):
+        self.file.write(json.dumps(request).encode() + b"\n")
+        self.file.flush()
+        return json.loads(self.file.readline())
+
+    def close(self):
+        self.file.close()
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve acceptance and best-move queries.")
+    parser.add_argument(
+        "data_paths",
+        nargs="*",
+        default=["Argumentation_Framework_tests"],
+        help="Data files or directories of them to preload.",
+    )
+    parser.add_argument("--socket", type=str, help="Listen on this Unix socket.")
+    parser.add_argument(
+        "--host", type=str, default="127.0.0.1", help="Host to listen on without --socket."
+    )
+    parser.add_argument(
+        "--port", type=int, default=8765, help="Port to listen on without --socket."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Solve queries in this many worker processes (default: in the server).",
+    )
+    args = parser.parse_args()
+
+    server = QueryServer(data_files(args.data_paths), args.workers)
+    try:
+        asyncio.run(server.serve(args.socket, args.host, args.port))
+    finally:
+        server.close()
@@ -0,0 +1,251 @@
+from collections import OrderedDict
+from framework import iter_bits
+from game_state import GameState
+from scc import cone_framework
+import instrument
+
+
+# LRU transposition table for the proponent search. Keys are
+# (argument id, proponent bitset, opponent bitset), values the number of extra
+# proponent moves to a winning position (-1 if there is none).
+class StrategyCache:
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+
+# One cache per framework, so it is shared by every turn and every game on it
+def strategy_cache(af):
+    cache = getattr(af, "_strategy_cache", None)
+    if cache is None:
+        cache = StrategyCache()
+        af._strategy_cache = cache
+    return cache
+
+
+# Depth-first search for a defence of argument i, just played by the proponent in
+# the search state: it loses if the opponent already used it or it attacks itself,
+# and wins once all its attackers are answered by the proponent. The path is played
+# on the state and undone on the way back. Returns the number of extra moves on the
+# first winning path found, or -1.
+def winning_depth(state, i, cache):
+    key = (i, state.proponent_mask, state.opponent_mask)
+    depth = cache.get(key)
+    if depth is not None:
+        return depth
+    if instrument.enabled:
+        instrument.count("strategy.nodes")
+
+    attackers = state.af.attackers(i)
+    if state.is_opponent(i) or state.af.is_self_attacking(i):
+        depth = -1
+    elif all(state.is_proponent(a) for a in attackers):
+        depth = 0
+    else:
+        depth = -1
+        for attacker in attackers:
+            if state.is_proponent(attacker):
+                continue
+            state.play_proponent(attacker)
+            next_depth = winning_depth(state, attacker, cache)
+            state.undo()
+            if next_depth >= 0:
+                depth = next_depth + 1
+                break
+
+    cache.put(key, depth)
+    return depth
+
+
+# Pick the option with the shortest winning path, falling back to the first option.
+# opponent_arguments is a list of names or already a bitset (GameState.opponent_mask).
+# Every argument the search can reach attacks the claim through a chain of attacks,
+# so given the claim it runs on the claim's upstream cone (scc.cone_framework), whose
+# attacker rows keep the framework's order; names are mapped through its index.
+# Each option is searched from a state holding the opponent's arguments and, on the
+# proponent's side, only the option itself.
+@instrument.timed("strategy.choose_proponent_move")
+def choose_proponent_move(af, options, opponent_arguments, cache=None, claim=None):
+    if claim is not None:
+        if isinstance(opponent_arguments, int):
+            opponent_arguments = [af.names[i] for i in iter_bits(opponent_arguments)]
+        af = cone_framework(af, claim)
+    if cache is None:
+        cache = strategy_cache(af)
+    state = GameState(af)
+    if isinstance(opponent_arguments, int):
+        opponent = iter_bits(opponent_arguments)
+    else:
+        opponent = (af.index[name] for name in opponent_arguments)
+    for i in opponent:
+        state.play_opponent(i)
+    best_argument = None
+    best_path_length = float("inf")
+
+    for argument in options:
+        i = af.index[argument]
+        state.play_proponent(i)
+        depth = winning_depth(state, i, cache)
+        state.undo()
+        if depth >= 0 and depth + 1 < best_path_length:
+            best_argument = argument
+            best_path_length = depth + 1
+
+    return best_argument if best_argument else options[0]
+
+
+# Exact solution of the discussion game by backward induction over its game tree.
+# It follows the rules of Game.proponent_turn / Game.opponent_turn:
+#   - the proponent answers the opponent's last argument with one of its attackers
+#     (the claimed argument on the first move) and loses if there is none or the
+#     first one was already used by the opponent
+#   - the opponent picks any attacker of a proponent argument it has not used yet,
+#     loses if there is none and wins if it picks a proponent argument
+# The opponent is assumed to pick uniformly among its options (as AutoGame does,
+# duplicates included), so each position stores the proponent's win probability,
+# whether it is a forced win (a winning strategy exists) and the best move.
+# The search plays and undoes the moves on one GameState, which lists the options of
+# both sides, and positions are keyed on its bitsets: (proponent, opponent, last
+# opponent argument) on the proponent's turn, (proponent, opponent) on the opponent's.
+#
+# The game tree grows exponentially with the size of the framework, so the table
+# stops at max_positions solved positions (and at Python's recursion limit, one level
+# per move) with TableTooLarge. The default of 200k positions takes about 1.5 s and
+# 50 MiB to fill; in practice that covers frameworks of a few dozen arguments with
+# few cycles (a 60-argument grid or a 40-argument random framework with density 0.1
+# already runs past it).
+MAX_POSITIONS = 200000
+
+
+class TableTooLarge(ValueError):
+    pass
+
+
+class StrategyTable:
+    def __init__(self, af, max_positions=MAX_POSITIONS):
+        self.af = af
+        self.max_positions = max_positions
+        self.proponent_positions = {}
+        self.opponent_positions = {}
+
+    # Solve every claimed argument, returns {argument: (win probability, forced win)}
+    def solve(self):
+        return {name: self.claim_value(name) for name in self.af.names}
+
+    @instrument.timed("strategy.solve_claim")
+    def claim_value(self, argument):
+        state = GameState(self.af)
+        state.play_proponent(self.af.index[argument])
+        return self.search(state, self.opponent_value)
+
+    # Best proponent move (name) in the position of the state, on the proponent's
+    # turn; a dict lookup once the position has been solved. The state is left as is.
+    def best_move(self, state):
+        _, _, move = self.search(state, self.proponent_value)
+        return None if move < 0 else self.af.names[move]
+
+    # (win probability, forced win) after the opponent plays move (an id) in the
+    # position of the state, on the opponent's turn. The state is left as is.
+    def opponent_move_value(self, state, move):
+        state.play_opponent(move)
+        probability, forced, _ = self.search(state, self.proponent_value, 1)
+        return probability, forced
+
+    # value(state), with the state taken back to where it was plus undo extra moves
+    # when the search ends, normally or not (e.g. on TableTooLarge)
+    def search(self, state, value, undo=0):
+        moves = len(state.history) - undo
+        try:
+            return value(state)
+        except RecursionError:
+            raise TableTooLarge("The game is too long to be solved exactly.") from None
+        finally:
+            while len(state.history) > moves:
+                state.undo()
+
+    def check_size(self):
+        if len(self.proponent_positions) + len(self.opponent_positions) >= self.max_positions:
+            raise TableTooLarge(
+                f"The game has more than {self.max_positions} positions, too many to be "
+                "solved exactly."
+            )
+
+    def proponent_value(self, state):
+        key = state.key()
+        value = self.proponent_positions.get(key)
+        if value is not None:
+            return value
+        self.check_size()
+        if instrument.enabled:
+            instrument.count("strategy.table_positions")
+
+        options = state.proponent_options()
+        if not options:
+            value = (0.0, False, -1)
+        else:
+            value = (-1.0, False, -1)
+            for move in options:
+                state.play_proponent(move)
+                probability, forced = self.opponent_value(state)
+                state.undo()
+                if (forced, probability) > (value[1], value[0]):
+                    value = (probability, forced, move)
+
+        self.proponent_positions[key] = value
+        return value
+
+    def opponent_value(self, state):
+        key = (state.proponent_mask, state.opponent_mask)
+        value = self.opponent_positions.get(key)
+        if value is not None:
+            return value
+        self.check_size()
+
+        # Each attacker is picked with weight = number of proponent arguments it attacks
+        weights = {}
+        for attacker in state.opponent_options():
+            weights[attacker] = weights.get(attacker, 0) + 1
+        if not weights:
+            value = (1.0, True)
+        else:
+            total = sum(weights.values())
+            probability = 0.0
+            forced = True
+            for move, weight in weights.items():
+                if state.is_proponent(move):
+                    forced = False
+                    continue
+                state.play_opponent(move)
+                move_probability, move_forced, _ = self.proponent_value(state)
+                state.undo()
+                probability += weight * move_probability
+                forced = forced and move_forced
+            value = (probability / total, forced)
+
+        self.opponent_positions[key] = value
+        return value
+
+
+def strategy_table(af):
+    table = getattr(af, "_strategy_table", None)
+    if table is None:
+        table = StrategyTable(af)
+        af._strategy_table = table
+    return table
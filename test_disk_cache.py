@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+import pytest
+
+# A query answered from the result cache prints exactly what the run that solved it
+# printed, witness included
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DATA_FILE = os.path.join(ROOT, "Argumentation_Framework_tests", "test4.json")
+
+
+def run(*args):
+    return subprocess.run(
+        [sys.executable, os.path.join(ROOT, "AF_semantics.py"), DATA_FILE, *args],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=ROOT,
+    ).stdout
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["3"],
+        ["1"],
+        ["3", "--engine", "enumerate"],
+        ["3", "--semantics", "preferred", "--skeptical"],
+        ["--all"],
+    ],
+)
+def test_cached_output_is_identical(tmp_path, args):
+    uncached = run(*args)
+    cache = ["--cache", str(tmp_path)]
+    assert run(*args, *cache) == uncached  # solved and stored
+    assert run(*args, *cache) == uncached  # answered from the cache
@@ -0,0 +1,34 @@
+import os
+import pytest
+from AF_semantics import ArgumentationFramework
+from framework import load_framework
+import sat
+
+# The three AF_semantics engines (labelling search on the kernel of the cone, the
+# reference subset enumeration and SAT) must agree on credulous acceptance under
+# admissible semantics, and every witness must be an admissible set with the claim
+
+TESTS_DIRECTORY = os.path.join(os.path.dirname(__file__), "Argumentation_Framework_tests")
+ENGINES = {
+    "labelling": lambda query: query.find_witness(),
+    "enumerate": lambda query: query.enumerate_witness(),
+    "sat": lambda query: sat.find_witness(query.af, query.argument),
+}
+
+
+@pytest.mark.parametrize(
+    "filename",
+    sorted(f for f in os.listdir(TESTS_DIRECTORY) if f.endswith(".json")),
+)
+def test_engines_agree(filename):
+    path = os.path.join(TESTS_DIRECTORY, filename)
+    af = load_framework(path)
+    for name in af.names:
+        answers = {}
+        for engine, find_witness in ENGINES.items():
+            witness = find_witness(ArgumentationFramework(path, name, engine))
+            answers[engine] = witness is not None
+            if witness is not None:
+                assert name in witness, (engine, name, witness)
+                assert af.is_admissible(af.mask(witness)), (engine, name, witness)
+        assert len(set(answers.values())) == 1, (name, answers)
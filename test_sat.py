@@ -0,0 +1,37 @@
+import os
+import pytest
+from framework import Framework, load_framework
+from generators import generate
+from sat import SOLVERS, crosscheck
+
+# The SAT backend must agree with the native engine on every argument, semantics and
+# mode, with every solver installed (python sat.py runs the same check by hand)
+
+TESTS_DIRECTORY = os.path.join(os.path.dirname(__file__), "Argumentation_Framework_tests")
+
+
+@pytest.mark.parametrize("solver", SOLVERS)
+@pytest.mark.parametrize(
+    "filename",
+    sorted(f for f in os.listdir(TESTS_DIRECTORY) if f.endswith(".json")),
+)
+def test_crosscheck_test_files(filename, solver):
+    af = load_framework(os.path.join(TESTS_DIRECTORY, filename))
+    assert crosscheck(af, solver) == []
+
+
+@pytest.mark.parametrize("solver", SOLVERS)
+@pytest.mark.parametrize(
+    "shape, n, density, seed",
+    [
+        ("erdos_renyi", 20, 0.1, 1),
+        ("erdos_renyi", 25, 0.06, 2),
+        ("grid", 25, None, 3),
+        ("grid", 30, 0.9, 4),
+        ("scale_free", 30, 0.1, 5),
+    ],
+)
+def test_crosscheck_generated(shape, n, density, seed, solver):
+    data = generate(shape, n, density, seed)
+    af = Framework(data["Arguments"], data["Attack Relations"])
+    assert crosscheck(af, solver) == []